@@ -0,0 +1,285 @@
+from bisect import bisect_right
+from process import Process
+from stack import Stack
+
+class ArrivalQueue:
+    """
+    Implementation of an arrival queue
+
+    The processes are kept sorted by arrival time with a cursor on the next process to arrive,
+    so releasing the k processes that arrived by a time is O(k) and the time of the next arrival
+    is known without visiting every time step in between.
+
+    Attributes:
+        processes (list): The processes sorted by arrival time, the ones before the cursor have arrived
+        cursor (int): The index of the next process to arrive
+    """
+    def __init__(self, processes: list = ()) -> None:
+        self.processes = sorted(processes, key=lambda p: p.arrival_time)
+        self.cursor = 0
+
+    @classmethod
+    def of(cls, source):
+        """
+        Makes an arrival queue out of a stack of processes, keeping the order in which
+        the stack would have released processes arriving at the same time.
+        An arrival queue is returned as it is.
+
+        Returns:
+            ArrivalQueue: The arrival queue of the processes
+        """
+        if isinstance(source, ArrivalQueue):
+            return source
+        if isinstance(source, Stack):
+            return cls(reversed(source.items))
+        return cls(source)
+
+    @classmethod
+    def fromArrays(cls, arrival_times, durations, tickets=None):
+        """
+        Bulk loads processes from arrays (e.g. NumPy arrays) of arrival times, durations and tickets
+
+        Example usage:
+        >>> ArrivalQueue.fromArrays(np.array([3, 0, 1]), np.array([5, 2, 4]))
+            ArrivalQueue()
+
+        Returns:
+            ArrivalQueue: The arrival queue of the processes
+        """
+        if hasattr(arrival_times, "argsort"):
+            order = arrival_times.argsort(kind="stable").tolist()
+        else:
+            order = sorted(range(len(arrival_times)), key=arrival_times.__getitem__)
+        arrival_list = arrival_times.tolist() if hasattr(arrival_times, "tolist") else list(arrival_times)
+        duration_list = durations.tolist() if hasattr(durations, "tolist") else list(durations)
+        if tickets is not None:
+            tickets = tickets.tolist() if hasattr(tickets, "tolist") else list(tickets)
+        queue = cls()
+        queue.processes = [Process(arrival_list[i], duration_list[i], tickets[i] if tickets is not None else None)
+                           for i in order]
+        return queue
+
+    @property
+    def items(self) -> list:
+        """
+        The processes that did not arrive yet, sorted by arrival time
+        """
+        return self.processes[self.cursor:]
+
+    def __len__(self) -> int:
+        return len(self.processes) - self.cursor
+
+    def push(self, process: Process) -> None:
+        """
+        Adds a process that did not arrive yet, after the processes arriving at the same time
+
+        Returns:
+            None
+        """
+        index = bisect_right(self.processes, process.arrival_time, lo=self.cursor, key=lambda p: p.arrival_time)
+        self.processes.insert(index, process)
+
+    def pushAll(self, processes: list) -> None:
+        """
+        Adds a batch of processes that did not arrive yet
+
+        Returns:
+            None
+        """
+        pending = self.processes[self.cursor:]
+        pending.extend(processes)
+        pending.sort(key=lambda p: p.arrival_time)
+        self.processes[self.cursor:] = pending
+
+    def remove(self, process: Process) -> None:
+        """
+        Removes a process that did not arrive yet
+
+        Returns:
+            None
+        """
+        for index in range(self.cursor, len(self.processes)):
+            if self.processes[index] is process:
+                del self.processes[index]
+                return
+
+    def popUntil(self, time) -> list:
+        """
+        Gets the processes that arrive at or before the given time, and moves the cursor past them
+
+        Example usage:
+        >>> arrivals.popUntil(10)
+            [Process, Process]
+
+        Returns:
+            List(Process): The arrived processes in arrival order
+        """
+        start = end = self.cursor
+        processes = self.processes
+        while end < len(processes) and processes[end].arrival_time <= time:
+            end += 1
+        if end == start:
+            return []
+        arrived = processes[start:end]
+        self.cursor = end
+        # Drop the arrived processes once they make up most of the list
+        if end > 1024 and 2 * end > len(processes):
+            del processes[:end]
+            self.cursor = 0
+        return arrived
+
+    def peak(self) -> Process:
+        """
+        Checks the next process to arrive
+
+        Returns:
+            Process: The next process to arrive, None if all of them arrived
+        """
+        return self.processes[self.cursor] if self.cursor < len(self.processes) else None
+
+    def nextArrivalTime(self):
+        """
+        Checks when the next process arrives
+
+        Returns:
+            int/None: The arrival time of the next process, None if all of them arrived
+        """
+        process = self.peak()
+        return process.arrival_time if process else None
+
+    def isEmpty(self) -> bool:
+        """
+        Checks if all the processes arrived or not
+
+        Returns:
+            bool: True if all of them arrived, False if not
+        """
+        return self.cursor >= len(self.processes)
+
+    def searchForProcess(self, name: str) -> Process:
+        """
+        Search for a process that did not arrive yet using a name
+
+        Returns:
+            Process/None: If found, None if not
+        """
+        for process in self.items:
+            if process.name == name:
+                return process
+        return None
+
+class ArrivalStream(ArrivalQueue):
+    """
+    Arrival queue reading its processes lazily from an iterator sorted by arrival time
+
+    Processes are only read from the source when the scheduler gets to their arrival time, and the arrived
+    ones are dropped as in ArrivalQueue, so only the processes between the current time step and the next
+    arrival are held in memory, however long the source is.
+
+    A snapshot of the stream saves its source as it is, so a stream can only be saved when its source can:
+    the sources of workload files and Workloads save their position instead of their processes.
+
+    Attributes:
+        source (Iterator(Process)): The processes that were not read yet
+        last_arrival_time (int): The arrival time of the last process read, to check the order of the source
+    """
+    def __init__(self, source) -> None:
+        super().__init__()
+        self.source = iter(source)
+        self.last_arrival_time = None
+
+    def read(self) -> bool:
+        """
+        Reads the next process of the source into the queue
+
+        Returns:
+            bool: True if a process was read, False if the source is exhausted
+        """
+        if self.source is None:
+            return False
+        process = next(self.source, None)
+        if process is None:
+            self.source = None
+            return False
+        if self.last_arrival_time is not None and process.arrival_time < self.last_arrival_time:
+            raise ValueError(f"{process.name} arrives at {process.arrival_time}, before the process read before it "
+                             f"at {self.last_arrival_time}: the workload must be sorted by arrival time")
+        self.last_arrival_time = process.arrival_time
+        self.processes.append(process)
+        return True
+
+    def fill(self, time=None) -> None:
+        """
+        Reads the processes arriving at or before the given time, and the one after them,
+        or the whole source when no time is given
+
+        Returns:
+            None
+        """
+        while self.source is not None and (time is None or self.last_arrival_time is None
+                                           or self.last_arrival_time <= time):
+            self.read()
+
+    @property
+    def items(self) -> list:
+        """
+        The processes that did not arrive yet, sorted by arrival time, reading the whole source
+        """
+        self.fill()
+        return self.processes[self.cursor:]
+
+    def __len__(self) -> int:
+        self.fill()
+        return len(self.processes) - self.cursor
+
+    def push(self, process: Process) -> None:
+        """
+        Adds a process that did not arrive yet, after the processes arriving at the same time
+
+        Returns:
+            None
+        """
+        self.fill(process.arrival_time)
+        super().push(process)
+
+    def pushAll(self, processes: list) -> None:
+        """
+        Adds a batch of processes that did not arrive yet
+
+        Returns:
+            None
+        """
+        processes = list(processes)
+        if processes:
+            self.fill(max(process.arrival_time for process in processes))
+        super().pushAll(processes)
+
+    def popUntil(self, time) -> list:
+        """
+        Gets the processes that arrive at or before the given time, reading them from the source
+
+        Returns:
+            List(Process): The arrived processes in arrival order
+        """
+        self.fill(time)
+        return super().popUntil(time)
+
+    def peak(self) -> Process:
+        """
+        Checks the next process to arrive
+
+        Returns:
+            Process: The next process to arrive, None if all of them arrived
+        """
+        if self.cursor >= len(self.processes):
+            self.read()
+        return super().peak()
+
+    def isEmpty(self) -> bool:
+        """
+        Checks if all the processes arrived or not
+
+        Returns:
+            bool: True if all of them arrived, False if not
+        """
+        return self.peak() is None
@@ -0,0 +1,268 @@
+import io
+import math
+import pickle
+import random
+import zlib
+from arrivals import ArrivalQueue
+from process import Process
+from stack import Stack
+from trace_ import Trace
+
+SNAPSHOT_VERSION = 1
+
+class SnapshotPickler(pickle.Pickler):
+    """
+    Pickler of scheduler snapshots, saving the global random module as a reference,
+    as schedulers drawing from it hold the module itself as their generator
+    """
+    def persistent_id(self, obj):
+        return "random" if obj is random else None
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """
+    Unpickler of scheduler snapshots, restoring the reference to the global random module
+    """
+    def persistent_load(self, pid):
+        if pid == "random":
+            return random
+        raise pickle.UnpicklingError(f"unknown reference {pid!r} in the snapshot")
+
+class ProcessAccumulator:
+    """
+    Running metrics of a process, updated in O(1) every time the scheduler records a segment.
+
+    Attributes:
+        arrival_time (int): When the process arrived.
+        burst_time (int): How long the process needs to run.
+        first_run (int): When the process was first dispatched, None if it did not run yet.
+        run_time (int): How long the process ran so far.
+        last_end (int): When the last run of the process ended, None if it did not run yet.
+        dispatches (int): How many times the process was given the CPU.
+    """
+    __slots__ = ("arrival_time", "burst_time", "first_run", "run_time", "last_end", "dispatches")
+
+    def __init__(self, arrival_time: int, burst_time: int) -> None:
+        self.arrival_time = arrival_time
+        self.burst_time = burst_time
+        self.first_run = None
+        self.run_time = 0
+        self.last_end = None
+        self.dispatches = 0
+
+    def snapshot(self, time_step: int) -> dict:
+        """
+        Gets the metrics of the process at a time step, the ones that are not known yet are None.
+
+        Returns:
+            dict: The arrival, first run, completion, burst, waiting, response and turnaround times,
+            how long the process ran and how many times it was dispatched.
+        """
+        completion = self.last_end if self.run_time >= self.burst_time else None
+        end = completion if completion is not None else time_step
+        return {"arrival_time": self.arrival_time,
+                "first_run": self.first_run,
+                "completion_time": completion,
+                "burst_time": self.burst_time,
+                "waiting_time": end - self.arrival_time - self.run_time,
+                "response_time": self.first_run - self.arrival_time if self.first_run is not None else None,
+                "turnaround_time": completion - self.arrival_time if completion is not None else None,
+                "run_time": self.run_time,
+                "dispatches": self.dispatches}
+
+class Scheduler:
+    """
+    Base class of the event-driven schedulers.
+
+    Instead of ticking one time unit at a time, a scheduler decides what runs at the current
+    time step and how long that decision holds (until the next arrival, quantum expiry, completion
+    or boost), then advances the time in one jump and records a single run-length segment.
+
+    Attributes:
+        arrivals (ArrivalQueue): The initialized processes that did not arrive yet.
+        time_step (int): Current time step in the scheduler.
+        trace (Trace): Run-length encoded schedule of the CPU.
+        accumulators (dict): The running metrics of each arrived process, by name.
+        last_state (str): The state of the CPU in the last recorded segment.
+        context_switches (int): How many times the CPU was given to a different process.
+    """
+    def __init__(self, process_stack: Stack) -> None:
+        self.arrivals = ArrivalQueue.of(process_stack)
+        self.time_step = 0
+        self.trace = Trace()
+        self.accumulators = {}
+        self.last_state = None
+        self.context_switches = 0
+
+    @property
+    def details(self) -> dict:
+        """
+        The state and level of the CPU at every time step, expanded from the trace on demand
+        """
+        return self.trace.toDict()
+
+    @details.setter
+    def details(self, details: dict) -> None:
+        self.trace = Trace.fromDict(details)
+
+    def advance(self, limit: int = None) -> bool:
+        """
+        Runs the next scheduling decision for at most limit time units,
+        or until the next scheduling event if no limit is given.
+
+        Returns:
+            bool: True if the simulation should continue, False otherwise.
+        """
+        raise NotImplementedError
+
+    def step(self) -> bool:
+        """
+        Executes a single time step.
+
+        Returns:
+            bool: True if the simulation should continue, False otherwise.
+        """
+        return self.advance(1)
+
+    def jump(self) -> bool:
+        """
+        Executes all the time steps up to the next scheduling event.
+
+        Returns:
+            bool: True if the simulation should continue, False otherwise.
+        """
+        return self.advance()
+
+    def run(self) -> Trace:
+        while self.jump():
+            continue
+        return self.trace
+
+    def snapshot(self) -> bytes:
+        """
+        Saves the whole state of the scheduler in a compressed binary snapshot: its queues, the processes
+        that did not arrive yet, the running process, the trace and running metrics so far, the PID counter
+        and the state of its random generator. A process held by several structures is saved once, so
+        the resumed scheduler makes exactly the same decisions as this one would.
+
+        Example usage:
+        >>> data = scheduler.snapshot()
+        >>> Scheduler.resume(data).run()
+
+        Returns:
+            bytes: The snapshot
+        """
+        uses_global_random = any(value is random for value in vars(self).values())
+        state = {"version": SNAPSHOT_VERSION,
+                 "scheduler": self,
+                 "pid_counter": Process.pid_counter,
+                 "random_state": random.getstate() if uses_global_random else None}
+        buffer = io.BytesIO()
+        SnapshotPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(state)
+        return zlib.compress(buffer.getvalue())
+
+    @staticmethod
+    def resume(data: bytes):
+        """
+        Restores a scheduler from a snapshot, every resume of a snapshot being an independent copy.
+        If the scheduler draws from the global random module, its state is restored too.
+
+        Returns:
+            Scheduler: The scheduler, at the time step of the snapshot
+        """
+        state = SnapshotUnpickler(io.BytesIO(zlib.decompress(data))).load()
+        if state["version"] != SNAPSHOT_VERSION:
+            raise ValueError(f"snapshot of version {state['version']}, expected {SNAPSHOT_VERSION}")
+        # New processes must not reuse the PIDs, and so the names, of the restored ones
+        Process.pid_counter = max(Process.pid_counter, state["pid_counter"])
+        if state["random_state"] is not None:
+            random.setstate(state["random_state"])
+        return state["scheduler"]
+
+    def admitArrivals(self, length: int = 1) -> list:
+        """
+        Gets the processes that arrive during the next length time steps.
+
+        Returns:
+            List(Process): A list of the arrived processes in arrival order.
+        """
+        arrived_processes = self.arrivals.popUntil(self.time_step + length - 1)
+        for process in arrived_processes:
+            self.accumulators[process.name] = ProcessAccumulator(process.arrival_time, process.duration)
+        return arrived_processes
+
+    def untilNextArrival(self) -> int:
+        """
+        Checks how many time steps are left until the next process arrives.
+
+        Returns:
+            int/None: Time steps until the next arrival, None if no process is left to arrive.
+        """
+        arrival_time = self.arrivals.nextArrivalTime()
+        if arrival_time is None:
+            return None
+        return max(math.ceil(arrival_time - self.time_step), 1)
+
+    def spanLength(self, limit: int = None, *lengths) -> int:
+        """
+        Calculates for how long the current decision holds, given the time left
+        until each upcoming event (None for events that will not happen).
+
+        Returns:
+            int: Number of time steps to advance, at least 1.
+        """
+        lengths = [length for length in lengths + (limit,) if length is not None]
+        return max(min(lengths), 1) if lengths else 1
+
+    def record(self, state: str, level: int, length: int) -> None:
+        """
+        Records that the CPU was in the given state and level for the next length time steps,
+        and advances the time.
+
+        Returns:
+            None
+        """
+        self.trace.append(state, level, length)
+        if state != self.last_state:
+            accumulator = self.accumulators.get(state)
+            if accumulator is not None:
+                self.context_switches += 1
+                accumulator.dispatches += 1
+                if accumulator.first_run is None:
+                    accumulator.first_run = self.time_step
+            self.last_state = state
+        accumulator = self.accumulators.get(state)
+        if accumulator is not None:
+            accumulator.run_time += length
+            accumulator.last_end = self.time_step + length
+        self.time_step += length
+
+    def metrics(self) -> dict:
+        """
+        Gets a snapshot of the running metrics of every arrived process, at the current time step.
+
+        Example usage:
+        >>> scheduler.metrics()
+            {'P1': {'arrival_time': 0, 'first_run': 0, 'completion_time': None, 'burst_time': 5, 'waiting_time': 0, ...}}
+
+        Returns:
+            dict(str, dict): The metrics of each process, by name.
+        """
+        return {name: accumulator.snapshot(self.time_step) for name, accumulator in self.accumulators.items()}
+
+# Benchmark
+if __name__ == "__main__":
+    import subprocess
+    import sys
+
+    # Every module is imported in a fresh interpreter, as in a new worker process.
+    # Importing the simulation must not load any of the heavy libraries, they are loaded on first use.
+    HEAVY_MODULES = ("numpy", "pandas", "matplotlib", "PIL")
+    code = ("import sys, time; start = time.perf_counter(); import {module}; "
+            "print(time.perf_counter() - start); print(' '.join(name for name in {heavy} if name in sys.modules))")
+    print("Module\t\tImport (ms)\tHeavy modules loaded")
+    for module in ("engine", "fcfs", "sjf", "srtf", "rr", "mlfq", "lottery", "scheduler", "pool"):
+        output = subprocess.run([sys.executable, "-c", code.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True).stdout.splitlines()
+        seconds, loaded = float(output[0]), output[1] if len(output) > 1 else ""
+        print(f"{module}\t\t{seconds * 1000:.1f}\t\t{loaded or '-'}")
+        assert not loaded, f"importing {module} loads {loaded}"
@@ -2,49 +2,44 @@ from queue_ import Queue
 from utils import *
 from stack import Stack
 from process import Process
+from engine import Scheduler
 
-class FCFS:
+class FCFS(Scheduler):
 
     counter = 0
 
     def __init__(self, process_stack):
+        super().__init__(process_stack)
         FCFS.counter += 1
         self.name = f"FCFS: {FCFS.counter}"
-        self.process_stack = process_stack
         self.queue = Queue()
-        self.details = {"state": [], "level":[]}
-        self.time_step = 0
     
-    def step(self):   
-        if not ( self.process_stack.isEmpty() and self.queue.isEmpty() ):
+    def advance(self, limit=None):
+        if not ( self.arrivals.isEmpty() and self.queue.isEmpty() ):
         
             # Get arrived process
-            arrived_processes = getArrivedProcesses(self.process_stack, self.time_step)
+            arrived_processes = self.admitArrivals()
             for process in arrived_processes:
                 self.queue.push(process)
             
             process = self.queue.peak()
             if process:
-                self.details["state"].append(process.name)
-                self.details["level"].append(0)
-                process.duration -= 1
+                # Arrivals join the back of the queue, so only the completion ends the run
+                length = self.spanLength(limit, process.duration)
+                for arrived_process in self.admitArrivals(length):
+                    self.queue.push(arrived_process)
+                self.record(process.name, 0, length)
+                process.duration -= length
                 if process.duration:
                     self.queue.changePeakProcess(process)
                 else:
                     self.queue.pop()
             else:
-                self.details["state"].append("idle")
-                self.details["level"].append(0)
+                self.record("idle", 0, self.spanLength(limit, self.untilNextArrival()))
             
-            self.time_step += 1
             return True
         return False
 
-    def run(self):
-        while self.step():
-            continue
-        return self.details
-
 if __name__ == "__main__":
     process_stack = Stack()
     process_stack.push(Process(0, 5))
@@ -0,0 +1,522 @@
+import math
+import zlib
+import matplotlib.colors as mcolors
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.path import Path
+from matplotlib.ticker import MaxNLocator
+from trace_ import Trace
+
+def generate_color(process_name: str) -> tuple:
+    """
+    Generates a dim and relaxing RGBA color code based on the number in the process name,
+    or on a stable hash of the name when it does not end with a number.
+
+    Arguments:
+    process_name (str): Name of the process (e.g., 'P1', 'P2', 'Printer').
+
+    Returns:
+    tuple: RGBA color.
+    """
+    if process_name == 'idle':
+        return '#808080'  # Default color for non-process states
+    if process_name.startswith('P') and process_name[1:].isdigit():
+        hue = int(process_name[1:]) / 10.0 % 1  # Ensure hue is between 0 and 1
+    else:
+        hue = zlib.crc32(process_name.encode()) / 2**32  # Same hue on every run, unlike hash()
+    saturation = 0.5  # Reduced saturation for a more muted color
+    value = 0.7  # Reduced brightness for a dimmer color
+    rgb_color = mcolors.hsv_to_rgb([hue, saturation, value])
+    return rgb_color  # Returns a RGB color, Matplotlib automatically considers alpha as 1
+
+class GanttChart:
+    """
+    Gantt chart of a trace, drawn on an existing axes
+
+    Every process is a single collection of rectangles, one per run-length segment, and the time axis
+    uses an automatic tick locator, so the drawing cost depends on the number of context switches and
+    not on the number of time steps. When the chart of the same trace moves forward, only the new
+    rectangle, or the longer last rectangle, of each process is added to its collection instead of
+    clearing and redrawing everything.
+
+    Attributes:
+        ax (Axes): The axes of the chart
+        canvas: The canvas of the axes, None to leave drawing to the caller
+        trace (Trace): The drawn trace
+        until (int): The number of drawn time steps of the trace
+        max_level (int): The lowest level drawn, at the bottom of the chart
+        spans (dict): The [start, length, level] of the runs of each process
+        collections (dict): The rectangles of each process
+    """
+    def __init__(self, ax, canvas=None) -> None:
+        self.ax = ax
+        self.canvas = canvas
+        self.trace = None
+        self.until = 0
+        self.width = 0
+        self.max_level = 0
+        self.spans = {}
+        self.collections = {}
+
+    def rectangle(self, start: int, length: int, level: int) -> list:
+        """
+        Gets the corners of the rectangle of a run
+
+        Returns:
+            list(tuple): The four corners of the rectangle
+        """
+        bottom = self.max_level - level - 0.4
+        return [(start, bottom), (start, bottom + 0.8), (start + length, bottom + 0.8), (start + length, bottom)]
+
+    def draw(self, data, until: int = None, width: int = 0) -> None:
+        """
+        Draws the first until time steps of a trace, the whole trace by default,
+        showing at least width time steps on the time axis
+
+        Returns:
+            None
+        """
+        trace = data if isinstance(data, Trace) else Trace.fromDict(data)
+        until = len(trace) if until is None else min(until, len(trace))
+        max_level = trace.maxLevel()
+        if trace is self.trace and until >= self.until and max_level == self.max_level:
+            self.extend(until)
+        else:
+            self.redraw(trace, until, max_level)
+        self.width = max(width, until)
+        self.ax.set_xlim(0, max(self.width, 1))
+        if self.canvas is not None:
+            self.canvas.draw_idle()
+
+    def redraw(self, trace: Trace, until: int, max_level: int) -> None:
+        """
+        Clears the axes and draws the chart from the beginning
+
+        Returns:
+            None
+        """
+        self.trace = trace
+        self.until = 0
+        self.spans = {}
+        self.collections = {}
+        self.setupAxes(max_level)
+        self.extend(until)
+
+    def setupAxes(self, max_level: int) -> None:
+        """
+        Clears the axes and draws the labels and grid of the chart
+
+        Returns:
+            None
+        """
+        self.max_level = max_level
+        self.ax.clear()
+        self.ax.set_xlabel('Time Steps')
+        self.ax.set_ylabel('Level')
+        self.ax.set_title('Gantt Chart of CPU Scheduler States')
+        self.ax.set_yticks(range(max_level + 1))
+        self.ax.set_yticklabels([str(max_level - level) for level in range(max_level + 1)])
+        self.ax.set_ylim(-0.5, max_level + 0.5)
+        self.ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+        self.ax.grid(True)
+
+    def extend(self, until: int) -> None:
+        """
+        Adds the time steps of the trace between the drawn ones and until to the chart
+
+        Returns:
+            None
+        """
+        new_states = False
+        for state, level, start, length in self.trace.segments(until, self.until):
+            if state == 'idle':
+                continue
+            spans = self.spans.setdefault(state, [])
+            extended = bool(spans) and spans[-1][0] + spans[-1][1] == start and spans[-1][2] == level
+            if extended:
+                spans[-1][1] += length
+            else:
+                spans.append([start, length, level])
+            if state not in self.collections:
+                collection = PolyCollection([], facecolors=[generate_color(state)], label=state)
+                self.collections[state] = self.ax.add_collection(collection)
+                new_states = True
+            # Only the last rectangle of the process is added or replaced, the others are kept as they are
+            corners = self.rectangle(*spans[-1])
+            path = Path(corners + corners[:1], closed=True)
+            paths = self.collections[state].get_paths()
+            if extended:
+                paths[-1] = path
+            else:
+                paths.append(path)
+            self.collections[state].stale = True
+        self.until = until
+
+        if new_states:
+            self.ax.legend(handles=[plt.Line2D([0], [0], color=generate_color(state), lw=4, label=state)
+                                    for state in self.collections], loc='upper right')
+
+def bucketOccupancy(ids, levels, starts, lengths, width: int) -> tuple:
+    """
+    Splits segments into buckets of width time steps and sums the time each state ran in each bucket and level
+
+    Returns:
+        tuple(np.ndarray): The bucket, level, state id and running time of every (bucket, level, state),
+        sorted by bucket, level and state id
+    """
+    ends = starts + lengths
+    first = starts // width
+    counts = (ends - 1) // width - first + 1
+    index = np.repeat(np.arange(len(ids)), counts)
+    buckets = first[index] + np.arange(len(index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    time = np.minimum(ends[index], (buckets + 1) * width) - np.maximum(starts[index], buckets * width)
+    return aggregateOccupancy(buckets, levels[index], ids[index], time)
+
+def aggregateOccupancy(buckets, levels, ids, time) -> tuple:
+    """
+    Sums the running times of the same state in the same bucket and level
+
+    Returns:
+        tuple(np.ndarray): The bucket, level, state id and running time of every (bucket, level, state),
+        sorted by bucket, level and state id
+    """
+    if not len(buckets):
+        return buckets, levels, ids, time
+    order = np.lexsort((ids, levels, buckets))
+    buckets, levels, ids, time = buckets[order], levels[order], ids[order], time[order]
+    first = np.ones(len(buckets), dtype=bool)
+    first[1:] = (np.diff(buckets) != 0) | (np.diff(levels) != 0) | (np.diff(ids) != 0)
+    first = np.flatnonzero(first)
+    return buckets[first], levels[first], ids[first], np.add.reduceat(time, first)
+
+def dominantStates(buckets, levels, ids, time) -> tuple:
+    """
+    Keeps the state that ran the longest in every bucket and level of an occupancy
+
+    Returns:
+        tuple(np.ndarray): The bucket, level and state id of every (bucket, level), sorted by bucket and level
+    """
+    if not len(buckets):
+        return buckets, levels, ids
+    order = np.lexsort((-time, levels, buckets))
+    buckets, levels, ids = buckets[order], levels[order], ids[order]
+    first = np.ones(len(buckets), dtype=bool)
+    first[1:] = (np.diff(buckets) != 0) | (np.diff(levels) != 0)
+    return buckets[first], levels[first], ids[first]
+
+class GrowingColumns:
+    """
+    Columns of NumPy arrays appended to in place, their capacity doubling when they are full,
+    so appending to them costs the appended values and not the values already in them
+
+    Attributes:
+        columns (list): The arrays of the columns, only their first size values are used
+        size (int): The number of values in each column
+    """
+    def __init__(self, count: int) -> None:
+        self.columns = [np.zeros(0, dtype=np.int64) for _ in range(count)]
+        self.size = 0
+
+    def append(self, *values) -> None:
+        """
+        Appends values at the end of every column
+
+        Returns:
+            None
+        """
+        size = self.size + len(values[0])
+        if size > len(self.columns[0]):
+            capacity = max(size, 2 * len(self.columns[0]), 16)
+            columns = [np.zeros(capacity, dtype=np.int64) for _ in self.columns]
+            for column, old_column in zip(columns, self.columns):
+                column[:self.size] = old_column[:self.size]
+            self.columns = columns
+        for column, column_values in zip(self.columns, values):
+            column[self.size:size] = column_values
+        self.size = size
+
+    def view(self) -> tuple:
+        """
+        Gets the used part of every column, without copying them
+
+        Returns:
+            tuple(np.ndarray): The columns
+        """
+        return tuple(column[:self.size] for column in self.columns)
+
+class TraceSummary:
+    """
+    Multi-resolution summary of a trace, to draw any window of it with about one rectangle per pixel and level
+
+    Resolution r splits the time into buckets of 2**r time steps and keeps the process that ran the longest
+    in each bucket and level. The resolutions from min_resolution up are precomputed, each one from the
+    one below it. Finer resolutions are only needed when zooming in, and are then computed from the segments
+    of the visible window, so the cost of a window depends on the screen width and not on the trace length.
+
+    A trace only grows, so the summary grows with it: only the time steps after the summarized ones are added,
+    and they only change the last bucket of each resolution, which is kept as the running time of every
+    process in it until it is complete.
+
+    Attributes:
+        trace (Trace): The summarized trace
+        duration (int): The number of summarized time steps of the trace
+        segments (int): The number of segments of the trace when it was summarized
+        names (int): The number of states of the trace when it was summarized
+        idle_ids (list): The state ids of the idle states of the trace
+        min_resolution (int): The finest precomputed resolution
+        max_resolution (int): The coarsest precomputed resolution, with a single bucket
+        busy (GrowingColumns): The state id, level, start and length of the segments of processes
+        closed (dict): The bucket, level and state id of the dominant processes of the complete buckets of
+                       each resolution
+        open (dict): The bucket, level, state id and running time of the processes of the last bucket of
+                     each resolution
+    """
+    def __init__(self, trace: Trace, min_resolution: int = 6) -> None:
+        self.trace = trace
+        self.duration = 0
+        self.segments = 0
+        self.names = 0
+        self.idle_ids = []
+        self.min_resolution = self.max_resolution = min_resolution
+        self.busy = GrowingColumns(4)
+        self.closed = {min_resolution: GrowingColumns(3)}
+        empty = np.zeros(0, dtype=np.int64)
+        self.open = {min_resolution: (empty, empty, empty, empty)}
+        self.extend()
+
+    def extend(self) -> None:
+        """
+        Adds the time steps of the trace after the summarized ones to the summary
+
+        Returns:
+            None
+        """
+        trace = self.trace
+        duration = trace.duration
+        if duration <= self.duration:
+            return
+        self.idle_ids += [state_id for state_id, name in enumerate(trace.names[self.names:], self.names)
+                          if name == 'idle']
+        self.names = len(trace.names)
+        # The last summarized segment may have grown, it is read again and cut at the summarized time.
+        # Copies, as views would keep the arrays of the trace from growing
+        first = max(self.segments - 1, 0)
+        ids = np.array(trace.ids[first:], dtype=np.int64)
+        levels = np.array(trace.levels[first:], dtype=np.int64)
+        starts = np.array(trace.starts[first:], dtype=np.int64)
+        ends = starts + np.array(trace.lengths[first:], dtype=np.int64)
+        starts = np.maximum(starts, self.duration)
+        new = (ends > starts) & ~np.isin(ids, self.idle_ids)
+        ids, levels, starts, lengths = ids[new], levels[new], starts[new], (ends - starts)[new]
+        busy_ids, busy_levels, busy_starts, busy_lengths = self.busy.view()
+        if len(ids) and len(busy_ids) and busy_ids[-1] == ids[0] and busy_levels[-1] == levels[0] \
+                and busy_starts[-1] + busy_lengths[-1] == starts[0]:
+            # The last segment grew, it stays one segment
+            busy_lengths[-1] += lengths[0]
+            self.busy.append(ids[1:], levels[1:], starts[1:], lengths[1:])
+        else:
+            self.busy.append(ids, levels, starts, lengths)
+
+        # Before the new time steps, a new coarser resolution only has its first bucket,
+        # holding everything the coarsest one held
+        previous_top = self.open[self.max_resolution]
+        occupancy = bucketOccupancy(ids, levels, starts, lengths, 1 << self.min_resolution)
+        resolution = self.min_resolution
+        while True:
+            if resolution not in self.open:
+                self.closed[resolution] = GrowingColumns(3)
+                self.open[resolution] = (np.zeros_like(previous_top[0]), *previous_top[1:])
+            merged = aggregateOccupancy(*(np.concatenate(columns) for columns in zip(self.open[resolution], occupancy)))
+            complete = np.searchsorted(merged[0], (duration - 1) >> resolution, side='left')
+            self.closed[resolution].append(*dominantStates(*(column[:complete] for column in merged)))
+            self.open[resolution] = tuple(column[complete:] for column in merged)
+            if resolution >= 62 or duration <= 1 << resolution:
+                break
+            occupancy = aggregateOccupancy(occupancy[0] >> 1, *occupancy[1:])
+            resolution += 1
+        self.max_resolution = resolution
+        self.duration = duration
+        self.segments = len(trace.ids)
+
+    def dominant(self, resolution: int, low: int, high: int, end: int) -> tuple:
+        """
+        Gets the dominant processes of the buckets from low to high of a resolution, the last bucket
+        only counting the time steps before end
+
+        Returns:
+            tuple(np.ndarray): The bucket, level and state id of every (bucket, level), sorted by bucket and level
+        """
+        buckets, levels, ids = self.closed[resolution].view()
+        # The last bucket is summed again from the segments when end cuts it, as the time after end was not
+        # drawn yet, or when it is not complete
+        recount = end < (high + 1) << resolution or high >= (self.duration - 1) >> resolution
+        first = np.searchsorted(buckets, low, side='left')
+        last = np.searchsorted(buckets, high, side='left' if recount else 'right')
+        buckets, levels, ids = buckets[first:last], levels[first:last], ids[first:last]
+        if recount:
+            last_bucket = dominantStates(*bucketOccupancy(*self.windowSegments(high << resolution, end),
+                                                          1 << resolution))
+            buckets, levels, ids = (np.concatenate(columns) for columns in zip((buckets, levels, ids), last_bucket))
+        return buckets, levels, ids
+
+    def windowSegments(self, start: int, end: int) -> tuple:
+        """
+        Gets the busy segments overlapping a window, clipped to it
+
+        Returns:
+            tuple(np.ndarray): The state id, level, start and length of the segments
+        """
+        ids, levels, starts, lengths = self.busy.view()
+        low = max(np.searchsorted(starts, start, side='right') - 1, 0)
+        high = np.searchsorted(starts, end, side='left')
+        ends = np.minimum(starts[low:high] + lengths[low:high], end)
+        starts = np.maximum(starts[low:high], start)
+        inside = ends > starts
+        return ids[low:high][inside], levels[low:high][inside], starts[inside], (ends - starts)[inside]
+
+    def window(self, start: int, end: int, pixels: int) -> tuple:
+        """
+        Gets the rectangles drawing the time steps from start to end on pixels pixels, at the
+        coarsest resolution that still has a bucket per pixel, merging neighbouring buckets of the same process
+
+        Returns:
+            tuple(np.ndarray): The start, length, level and state id of every rectangle
+        """
+        start, end = max(start, 0), min(end, self.duration)
+        if start >= end:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, empty
+        span = end - start
+        resolution = math.ceil(math.log2(span / pixels)) if span > pixels else 0
+        if resolution == 0:
+            ids, levels, starts, lengths = self.windowSegments(start, end)
+            return starts, lengths, levels, ids
+
+        resolution = min(resolution, self.max_resolution)
+        if resolution >= self.min_resolution:
+            buckets, levels, ids = self.dominant(resolution, start >> resolution, (end - 1) >> resolution, end)
+        else:
+            buckets, levels, ids = dominantStates(*bucketOccupancy(*self.windowSegments(start, end), 1 << resolution))
+        if not len(buckets):
+            # The CPU was idle during the whole window
+            return buckets, buckets, levels, ids
+
+        # Runs of neighbouring buckets of the same process on the same level become one rectangle
+        order = np.lexsort((buckets, levels))
+        buckets, levels, ids = buckets[order], levels[order], ids[order]
+        first = np.ones(len(buckets), dtype=bool)
+        first[1:] = (np.diff(buckets) != 1) | (np.diff(levels) != 0) | (np.diff(ids) != 0)
+        first = np.flatnonzero(first)
+        last = np.append(first[1:], len(buckets)) - 1
+        starts = np.maximum(buckets[first] << resolution, start)
+        ends = np.minimum((buckets[last] + 1) << resolution, end)
+        return starts, ends - starts, levels[first], ids[first]
+
+class ZoomableGanttChart(GanttChart):
+    """
+    Gantt chart that stays fast and readable for traces of millions of time steps
+
+    Up to detail_limit time steps it is drawn like a GanttChart. Longer traces are drawn from a TraceSummary:
+    only the visible window is drawn, with about one rectangle per pixel and level, and it is drawn again from
+    a finer resolution whenever the axes are zoomed or panned, for example with the matplotlib toolbar.
+
+    Attributes:
+        detail_limit (int): The most time steps drawn segment by segment
+        summary (TraceSummary): The summary of the drawn trace
+        collection (PolyCollection): The rectangles of the visible window
+        colors (dict): The color of each state id
+    """
+    def __init__(self, ax, canvas=None, detail_limit: int = 20000) -> None:
+        super().__init__(ax, canvas)
+        self.detail_limit = detail_limit
+        self.summary = None
+        self.collection = None
+        self.callback = None
+        self.colors = {}
+
+    def draw(self, data, until: int = None, width: int = 0) -> None:
+        """
+        Draws the first until time steps of a trace, the whole trace by default,
+        showing at least width time steps on the time axis
+
+        Returns:
+            None
+        """
+        trace = data if isinstance(data, Trace) else Trace.fromDict(data)
+        until = len(trace) if until is None else min(until, len(trace))
+        if self.callback is not None:
+            self.ax.callbacks.disconnect(self.callback)
+            self.callback = None
+        if until <= self.detail_limit:
+            super().draw(trace, until, width)
+            return
+
+        if self.summary is None or self.summary.trace is not trace:
+            self.summary = TraceSummary(trace)
+            self.colors = {}
+        else:
+            # The trace only grew since it was summarized, as when stepping live
+            self.summary.extend()
+        # The summary replaces the segments, a later detailed drawing starts over
+        self.trace = None
+        self.until = until
+        self.width = max(width, until)
+        self.setupAxes(trace.maxLevel())
+        self.collection = self.ax.add_collection(PolyCollection([]))
+        self.callback = self.ax.callbacks.connect('xlim_changed', self.refresh)
+        self.ax.set_xlim(0, self.width)
+        if self.canvas is not None:
+            self.canvas.draw_idle()
+
+    def refresh(self, ax=None) -> None:
+        """
+        Draws the visible window of the summarized trace at the resolution of the screen
+
+        Returns:
+            None
+        """
+        low, high = self.ax.get_xlim()
+        starts, lengths, levels, ids = self.summary.window(math.floor(low), min(math.ceil(high), self.until),
+                                                           max(int(self.ax.bbox.width), 1))
+        bottoms = self.max_level - levels - 0.4
+        verts = np.empty((len(starts), 4, 2))
+        verts[:, :2, 0] = starts[:, None]
+        verts[:, 2:, 0] = (starts + lengths)[:, None]
+        verts[:, (0, 3), 1] = bottoms[:, None]
+        verts[:, 1:3, 1] = (bottoms + 0.8)[:, None]
+        self.collection.set_verts(verts)
+
+        names = self.summary.trace.names
+        for state_id in set(ids.tolist()) - self.colors.keys():
+            self.colors[state_id] = mcolors.to_rgba(generate_color(names[state_id]))
+        self.collection.set_facecolor([self.colors[state_id] for state_id in ids.tolist()])
+
+        # A legend of thousands of processes hides the chart, it is only shown for a few visible ones
+        visible = list(dict.fromkeys(ids.tolist()))
+        if len(visible) <= 20:
+            self.ax.legend(handles=[plt.Line2D([0], [0], color=self.colors[state_id], lw=4, label=names[state_id])
+                                    for state_id in sorted(visible)], loc='upper right')
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+
+# Benchmark
+if __name__ == "__main__":
+    import matplotlib
+    matplotlib.use("Agg")
+    from timeit import timeit
+    from rr import RoundRobin
+    from utils import initializeProcessStack
+
+    trace = RoundRobin(initializeProcessStack(num_processes=10000, max_arrival_time=80000), 2).run()
+    print(f"{len(trace)} time steps, {len(trace.ids)} segments")
+    fig, ax = plt.subplots(figsize=(15, 8))
+    summary_time = timeit(lambda: TraceSummary(trace), number=1)
+    print(f"Summary: {summary_time:.3f} s")
+    chart = ZoomableGanttChart(ax)
+    print(f"Full view: {timeit(lambda: (chart.draw(trace), fig.canvas.draw()), number=1):.3f} s, "
+          f"{len(chart.collection.get_paths())} rectangles")
+    for span in (100000, 5000, 200):
+        zoom_time = timeit(lambda: (ax.set_xlim(len(trace) // 2, len(trace) // 2 + span), fig.canvas.draw()), number=1)
+        print(f"Window of {span} time steps: {zoom_time:.3f} s, {len(chart.collection.get_paths())} rectangles")
+    print(f"Segment by segment: {timeit(lambda: (GanttChart(ax).draw(trace), fig.canvas.draw()), number=1):.3f} s")
@@ -1,28 +1,152 @@
 from process import *
-from queue_ import Queue
+from ticket_queue import TicketQueue
 from stack import Stack
 from utils import *
+from engine import Scheduler
 from priority_queue import *
 
-from random import randint
+import random
+import heapq
 
-class Lottery:
-    def __init__(self, process_stack, quantum, pre_emptive):
-        self.process_stack = process_stack
-        self.queue = Queue()
+class AliasTable:
+    """
+    Implementation of a Walker alias table, drawing processes proportionally to their tickets in O(1)
+
+    Every column holds the tickets of one process, topped up to the average number of tickets
+    with tickets of an alias process, so a draw needs one column and one ticket inside it.
+    Finished processes are discarded by redrawing when they win, which keeps the draw
+    proportional among the remaining processes without rebuilding the table.
+
+    Attributes:
+        processes (list): The processes of the table
+        thresholds (list): The tickets of each column owned by its own process, scaled by the number of processes
+        aliases (list): The index of the process owning the rest of each column
+        total (int): The total number of tickets, which is the scaled height of every column
+        discarded (set): The processes that must not be drawn anymore
+        discarded_tickets (int): The total number of tickets of the discarded processes
+        generator (random.Random): The source of the random numbers of the draws
+    """
+    def __init__(self, processes: list, generator=random) -> None:
+        self.processes = processes
+        self.generator = generator
+        self.total = sum(process.tickets for process in processes)
+        count = len(processes)
+        scaled = [process.tickets * count for process in processes]
+        self.thresholds = [self.total] * count
+        self.aliases = list(range(count))
+        self.discarded = set()
+        self.discarded_tickets = 0
+        small = [i for i in range(count) if scaled[i] < self.total]
+        large = [i for i in range(count) if scaled[i] >= self.total]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.thresholds[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] -= self.total - scaled[less]
+            if scaled[more] < self.total:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def sample(self) -> Process:
+        """
+        Draws a process
+
+        Returns:
+            Process: The drawn process
+        """
+        while True:
+            column = self.generator.randrange(len(self.processes))
+            if self.generator.randrange(self.total) < self.thresholds[column]:
+                process = self.processes[column]
+            else:
+                process = self.processes[self.aliases[column]]
+            if process not in self.discarded:
+                return process
+
+    def discard(self, process: Process) -> None:
+        """
+        Stops a process from being drawn
+
+        Returns:
+            None
+        """
+        self.discarded.add(process)
+        self.discarded_tickets += process.tickets
+
+    def isStale(self) -> bool:
+        """
+        Checks if the discarded processes hold half of the tickets, making draws too slow
+
+        Returns:
+            bool: True if the table should be rebuilt, False if not
+        """
+        return 2 * self.discarded_tickets >= self.total
+
+class Lottery(Scheduler):
+    def __init__(self, process_stack, quantum, pre_emptive, batched=False, generator=None):
+        super().__init__(process_stack)
+        # The global random state by default, or an independent random.Random stream
+        self.generator = generator or random
+        self.queue = TicketQueue()
         self.quantum = quantum
         self.pre_emptive = pre_emptive
+        self.batched = batched
+        self.alias_table = None
         self.waiting_processes = []
-        self.time_step = 0
-        self.details = {"state": [], "level": []}
         self.pick_next = None
-        # print(self.pre_emptive)
 
-    def step(self):
-        if not (self.process_stack.isEmpty() and self.queue.isEmpty() and not self.waiting_processes):
+    def drawProcess(self, current_max_tickets):
+        """
+        Draws a winning ticket and finds the process holding it
+
+        In batched mode the winner is drawn from an alias table of the ready processes, which
+        is only rebuilt when a process arrives, or when finished processes hold half of its tickets.
+
+        Returns:
+            Process: The process holding the winning ticket
+        """
+        if self.batched:
+            if self.alias_table is None:
+                self.alias_table = AliasTable(list(self.queue), self.generator)
+            return self.alias_table.sample()
+        random_ticket = self.generator.randint(0, current_max_tickets - 1)
+        return self.queue.draw(random_ticket)
+
+    def finishProcess(self, process):
+        """
+        Discards a finished process from the alias table of the batched mode
+
+        Returns:
+            None
+        """
+        if self.alias_table is not None:
+            self.alias_table.discard(process)
+            if self.alias_table.isStale():
+                self.alias_table = None
+
+    def burnDraws(self, current_max_tickets, count):
+        """
+        Draws the tickets of the time steps where the running process is already picked.
+        The draws do not change the schedule, but keep the random stream, and therefore
+        seeded runs, identical to stepping one time unit at a time.
+
+        Returns:
+            None
+        """
+        if self.batched:
+            return
+        for _ in range(count):
+            self.generator.randint(0, current_max_tickets - 1)
+
+    def advance(self, limit=None):
+        if not (self.arrivals.isEmpty() and self.queue.isEmpty() and not self.waiting_processes):
 
             # Get arrived process
-            arrived_processes = getArrivedProcesses(self.process_stack, self.time_step)
+            arrived_processes = self.admitArrivals()
+            if arrived_processes:
+                self.alias_table = None
             for process in arrived_processes:
                 process.quantum = self.quantum
                 self.queue.push(process)
@@ -33,27 +157,20 @@ class Lottery:
             self.waiting_processes = []
             
             
-            current_max_tickets = sum(process.tickets for process in self.queue.items)
+            current_max_tickets = self.queue.totalTickets()
             
             if current_max_tickets > 0:
                 # determine winning ticket
-                random_ticket = randint(0, current_max_tickets - 1)
-                chosen_process = None
-                ticket_sum = 0
-                for process in self.queue.items:
-                    ticket_sum += process.tickets
-                    if ticket_sum > random_ticket:
-                        chosen_process = process
-                        break
+                chosen_process = self.drawProcess(current_max_tickets)
 
                 if self.pre_emptive:
                     # Preemptive behavior
-                    # print('pre')
                     if chosen_process:
                         chosen_process = self.pick_next if self.pick_next != None else chosen_process 
-                        chosen_process.decrementDuration()
-                        self.details["state"].append(chosen_process.name)
-                        self.details["level"].append(0)
+                        length = self.spanLength(limit, chosen_process.duration, chosen_process.quantum or 1, self.untilNextArrival())
+                        self.burnDraws(current_max_tickets, length - 1)
+                        chosen_process.decrementDuration(length)
+                        self.record(chosen_process.name, 0, length)
                         if chosen_process.duration:
                             if chosen_process.quantum:
                                 self.pick_next = chosen_process
@@ -66,20 +183,20 @@ class Lottery:
                         else:
                             self.pick_next = None
                             self.queue.remove(chosen_process)
+                            self.finishProcess(chosen_process)
                     else:
-                        self.details["state"].append("idle")
-                        self.details["level"].append(0)
+                        self.record("idle", 0, 1)
 
                 else:
                     # Non-preemptive behavior
-                    # print('non-pre')
                     if chosen_process:
                         current_process = chosen_process
                         if current_process:
                             current_process = self.pick_next if self.pick_next != None else chosen_process 
-                            current_process.decrementDuration()
-                            self.details["state"].append(current_process.name)
-                            self.details["level"].append(0)
+                            length = self.spanLength(limit, current_process.duration, self.untilNextArrival())
+                            self.burnDraws(current_max_tickets, length - 1)
+                            current_process.decrementDuration(length)
+                            self.record(current_process.name, 0, length)
                             if current_process.duration:
                                 self.pick_next = current_process
                                 # self.queue.changePeakProcess(current_process)
@@ -88,23 +205,92 @@ class Lottery:
                             else:
                                 self.pick_next = None
                                 self.queue.remove(current_process)
+                                self.finishProcess(current_process)
                         else:
-                            self.details["state"].append("idle")
-                            self.details["level"].append(0)
+                            self.record("idle", 0, 1)
                     else:
-                        self.details["state"].append("idle")
-                        self.details["level"].append(0)
+                        self.record("idle", 0, 1)
 
+            elif self.queue.isEmpty():
+                self.record("idle", 0, self.spanLength(limit, self.untilNextArrival()))
             else:
-                self.details["state"].append("idle")
-                self.details["level"].append(0)
+                self.record("idle", 0, 1)
             
-            self.time_step += 1
             return True
         
         return False
 
-    def run(self):
-        while self.step():
-            continue
-        return self.details
\ No newline at end of file
+class Stride(Scheduler):
+    """
+    The Stride class implements stride scheduling, a deterministic proportional-share scheduler.
+    Every process has a stride inversely proportional to its tickets and a pass value, the process
+    with the smallest pass runs for one quantum and then advances its pass by its stride.
+
+    Attributes:
+        arrivals (ArrivalQueue): The initialized processes that did not arrive yet.
+        quantum (int): The time each process runs before the next pick.
+        heap (list): The ready processes as [pass, arrival order, process] entries.
+        global_pass (int): The pass of the last picked process, given to arriving processes.
+        current_process (Process): The process running its quantum.
+        current_pass (int): The pass of the running process.
+    """
+    counter = 0
+    stride1 = 1 << 20
+
+    def __init__(self, process_stack: Stack, quantum: int) -> None:
+        super().__init__(process_stack)
+        Stride.counter += 1
+        self.name = f"Stride: {Stride.counter}"
+        self.quantum = quantum
+        self.heap = []
+        self.order = 0
+        self.global_pass = 0
+        self.current_process = None
+        self.current_pass = 0
+
+    def stride(self, process: Process) -> int:
+        """
+        Calculates the stride of a process from its tickets
+
+        Returns:
+            int: The stride of the process
+        """
+        return Stride.stride1 // process.tickets
+
+    def enter(self, process: Process, pass_value: int) -> None:
+        """
+        Adds a process to the ready processes
+
+        Returns:
+            None
+        """
+        self.order += 1
+        heapq.heappush(self.heap, [pass_value, self.order, process])
+
+    def advance(self, limit: int = None) -> bool:
+        if not (self.arrivals.isEmpty() and not self.heap and not self.current_process):
+            for process in self.admitArrivals():
+                self.enter(process, self.global_pass)
+
+            if not self.current_process and self.heap:
+                self.current_pass, _, self.current_process = heapq.heappop(self.heap)
+                self.global_pass = self.current_pass
+                self.current_process.quantum = self.quantum
+
+            process = self.current_process
+            if process:
+                # Arrivals only take part in the next pick, so only the quantum expiry or the completion ends the run
+                length = self.spanLength(limit, process.duration, process.quantum or 1)
+                for arrived_process in self.admitArrivals(length):
+                    self.enter(arrived_process, self.global_pass)
+                process.decrementDuration(length)
+                self.record(process.name, 0, length)
+                if not process.duration:
+                    self.current_process = None
+                elif not process.quantum:
+                    self.enter(process, self.current_pass + self.stride(process))
+                    self.current_process = None
+            else:
+                self.record("idle", 0, self.spanLength(limit, self.untilNextArrival()))
+            return True
+        return False
@@ -2,20 +2,34 @@ import tkinter as tk
 import os
 from tkinter import ttk
 from tkinter import messagebox
-from PIL import Image, ImageTk
+from tkinter import filedialog
 from queue_ import Queue
+from trace_ import Trace
 from utils import *
-from mlfq import MLFQ
-from sjf import SJF
-from fcfs import FCFS
-from srtf import SRTF
-from rr import RoundRobin
-from lottery import Lottery
-from matplotlib.figure import Figure 
-from matplotlib.backends.backend_tkagg import (FigureCanvasTkAgg,  
-NavigationToolbar2Tk) 
+from scheduler import createScheduler, runJob, workloadOf
+from trace_file import MappedTrace, TraceReplay, writeTraceFile
+from concurrent.futures import ProcessPoolExecutor
 import traceback
 
+class Frames(dict):
+    """ The frames of the application, by class.
+
+    A frame is constructed and added to the container the first time it is looked up,
+    so starting the application does not build the frames that are never shown.
+    """
+    def __init__(self, container, controller) -> None:
+        super().__init__()
+        self.container = container
+        self.controller = controller
+
+    def __missing__(self, frame_class):
+        frame = frame_class(self.container, self.controller)
+        self[frame_class] = frame
+        frame.grid(row=0, column=0, sticky="nsew")
+        # Under the shown frame until showFrame raises it
+        frame.lower()
+        return frame
+
 class SchedulerApp(tk.Tk):
     """ Main application class for the scheduler simulation.
 
@@ -37,8 +51,8 @@ class SchedulerApp(tk.Tk):
         container.grid_columnconfigure(0, weight=1)
         self.iconbitmap('schedule.ico')
 
-        # Initialize a dictionary to hold the frames
-        self.frames = {}
+        # The frames are constructed the first time they are shown or used
+        self.frames = Frames(container, self)
 
         self.scheduler_name = ""
         self.configurations = dict()
@@ -48,27 +62,16 @@ class SchedulerApp(tk.Tk):
         self.processes_IO = None
         self.time_step = -1
         self.process_data = None
-        self.prev_details = {'state': [], 'level': []}
-        self.past_details = []
+        self.prev_trace = Trace()
+        self.prev_accumulators = {}
+        self.prev_last_state = None
+        self.prev_context_switches = 0
         self.finished = False
         self.results = None
         self.schedulers = []
 
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        # Iterate over the frame classes and add them to the container
-        for F in (StartFrame, RoundRobinFrame, ProcessConfigFrame,
-                  MLFQFrame, MLFQConfigFrame, LotteryFrame,
-                  CustomProcessConfigFrame, CustomProcessCreationFrame,
-                  CustomProcessCreationFrameTickets, FinalFrame, REStartFrame,
-                  RELotteryFrame, REMLFQConfigFrame, REMLFQFrame, RERoundRobinFrame,
-                  RECustomProcessCreationFrame, REProcessConfigFrame, ModifyProcessFrame,
-                  RemoveProcesses, InitialFrame, SCMLFQConfigFrame, SCMLFQFrame, SCRoundRobinFrame,
-                  SCStartFrame, SCFinalFrame):
-            frame = F(container, self)
-            self.frames[F] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
-
         # Display the initial frame
         self.showFrame(InitialFrame)
 
@@ -101,7 +104,7 @@ class SchedulerApp(tk.Tk):
             self.geometry(f"1620x800")
         elif cont == ModifyProcessFrame:
             self.geometry("400x100")
-        elif cont == SCStartFrame:
+        elif cont == SCStartFrame or cont == InitialFrame:
             self.geometry("400x200")
         elif cont == RemoveProcesses:
             self.geometry(f"400x{200+ 25*len(self.frames[RemoveProcesses].names)}")
@@ -113,77 +116,25 @@ class SchedulerApp(tk.Tk):
         self.process_data = getProcessData(self.processes)
         for process in self.processes.items:
             self.total_duration += process.duration
-        self.details = {"state":['idle']*self.total_duration, "level":[0]*self.total_duration}
-        self.past_details.append(self.details)
-        if self.scheduler_name == "MLFQ":
-            self.scheduler = MLFQ(process_stack=self.processes,
-                                    boost_time=self.configurations["boost_time"],
-                                    pre_emptive=self.configurations["pre-emptive"],
-                                    quanta=self.configurations["quanta"],
-                                    structure=self.configurations["structure"])
-        if self.scheduler_name == "SJF":
-            self.scheduler = SJF(process_stack=self.processes)
-        if self.scheduler_name == "FCFS":
-            self.scheduler = FCFS(process_stack=self.processes)
-        if self.scheduler_name == "SRTF":
-            self.scheduler = SRTF(process_stack=self.processes)
-        if self.scheduler_name == "Round-Robin":
-            self.scheduler = RoundRobin(process_stack=self.processes, quantum=self.configurations["quantum"])
-        if self.scheduler_name == "Lottery":
-            self.scheduler = Lottery(process_stack=self.processes, quantum=self.configurations["quantum"], pre_emptive=self.configurations["pre-emptive"])
-
+        self.scheduler = createScheduler(self.scheduler_name, self.processes, self.configurations)
 
     def calculateAllMetrics(self):
-        self.results = calculateMetrics(self.details["state"], self.process_data)
+        self.results = calculateMetrics(self.scheduler.trace, self.process_data)
         return
 
     def reSetupScheduler(self):
-        if self.scheduler_name == "MLFQ":
-            self.scheduler = MLFQ(process_stack=self.processes,
-                                    boost_time=self.configurations["boost_time"],
-                                    pre_emptive=self.configurations["pre-emptive"],
-                                    quanta=self.configurations["quanta"],
-                                    structure=self.configurations["structure"])
-            while self.queue.peak():
-                self.scheduler.structure[0].push(self.queue.pop())
-            for process in self.waiting_processes:
-                self.scheduler.structure[0].push(process)
-            self.scheduler.details = self.prev_details
-        if self.scheduler_name == "SJF":
-            self.scheduler = SJF(process_stack=self.processes)
-            while self.queue.peak():
-                self.scheduler.queue.push(self.queue.pop())
-            for process in self.waiting_processes:
-                self.scheduler.queue.push(process)
-            self.scheduler.details = self.prev_details
-        if self.scheduler_name == "FCFS":
-            self.scheduler = FCFS(process_stack=self.processes)
-            while self.queue.peak():
-                self.scheduler.queue.push(self.queue.pop())
-            for process in self.waiting_processes:
-                self.scheduler.queue.push(process)
-            self.scheduler.details = self.prev_details
-        if self.scheduler_name == "SRTF":
-            self.scheduler = SRTF(process_stack=self.processes)
-            while self.queue.peak():
-                self.scheduler.queue.push(self.queue.pop())
-            for process in self.waiting_processes:
-                self.scheduler.queue.push(process)
-            self.scheduler.details = self.prev_details
-        if self.scheduler_name == "Round-Robin":
-            self.scheduler = RoundRobin(process_stack=self.processes, quantum=self.configurations["quantum"])
-            while self.queue.peak():
-                self.scheduler.queue.push(self.queue.pop()) 
-            for process in self.waiting_processes:
-                self.scheduler.queue.push(process)
-            self.scheduler.details = self.prev_details
-        if self.scheduler_name == "Lottery":
-            self.scheduler = Lottery(process_stack=self.processes, quantum=self.configurations["quantum"], pre_emptive=self.configurations["pre-emptive"])
-            while self.queue.peak():
-                self.scheduler.queue.push(self.queue.pop())
-            for process in self.waiting_processes:
-                self.scheduler.queue.push(process)
-            self.scheduler.details = self.prev_details
+        self.scheduler = createScheduler(self.scheduler_name, self.processes, self.configurations)
+        queue = self.scheduler.structure[0] if self.scheduler_name == "MLFQ" else self.scheduler.queue
+        while self.queue.peak():
+            queue.push(self.queue.pop())
+        for process in self.waiting_processes:
+            queue.push(process)
+        self.scheduler.trace = self.prev_trace
+        self.scheduler.time_step = len(self.prev_trace)
+        self.scheduler.accumulators = self.prev_accumulators
+        # The CPU goes on from where the previous scheduler left it, which is not a context switch by itself
+        self.scheduler.last_state = self.prev_last_state
+        self.scheduler.context_switches = self.prev_context_switches
 
     def on_close(self):
         # You can perform any cleanup or confirmation here
@@ -202,36 +153,81 @@ class SchedulerApp(tk.Tk):
             print("Error occurred while deleting files.")
 
     def step(self):
+        # The history is the trace itself: the chart after step k is its first k time steps
         if self.scheduler.step():
             self.time_step += 1
-            if self.time_step >= len(self.details['state']):
-                self.details['state'].append(self.scheduler.details['state'][self.time_step])
-                self.details['level'].append(self.scheduler.details['level'][self.time_step])
-            else:
-                self.details['state'][self.time_step] = self.scheduler.details['state'][self.time_step]
-                self.details['level'][self.time_step] = self.scheduler.details['level'][self.time_step]
-            self.processes = self.scheduler.process_stack
-            details = {'state': [], 'level': []}
-            for i in range(len(self.details['state'])):
-                details['state'].append(self.details['state'][i])
-                details['level'].append(self.details['level'][i])
-            self.past_details.append(details)
+            self.processes = self.scheduler.arrivals
             self.finished = False
             return True
         self.finished = True
         return False
+
+    def run(self):
+        self.scheduler.run()
+        self.time_step = len(self.scheduler.trace) - 1
+        self.processes = self.scheduler.arrivals
+        self.finished = True
+
+    def replayTrace(self, path):
+        # The trace file is memory-mapped and navigated like a finished simulation
+        trace = MappedTrace(path)
+        self.scheduler_name = "Replay"
+        self.scheduler = TraceReplay(trace)
+        self.process_data = trace.process_data
+        self.total_duration = len(trace)
+        self.time_step = len(trace) - 1
+        self.processes = self.scheduler.arrivals
+        self.finished = True
+
+    def saveTrace(self, path):
+        writeTraceFile(path, self.scheduler.trace, self.process_data)
+
+    def historyLength(self):
+        # Number of charts to navigate, the one before the first step included
+        return self.time_step + 2
+
+    def drawHistory(self, steps, chart):
+        # Moving forward only adds the new time steps to the chart
+        chart.draw(self.scheduler.trace, until=steps, width=self.total_duration)
     
+    def addComparison(self, scheduler_name, configurations=None):
+        count = sum(1 for job in self.schedulers if job[1] == scheduler_name) + 1
+        self.schedulers.append((f"{scheduler_name}: {count}", scheduler_name, configurations or {}))
+
     def computePerformance(self):
+        # Every scheduler runs in its own worker process on one copy of the workload, shared in memory,
+        # and the results are collected from the Tk event loop as soon as each one finishes
         self.scheduler_names = []
         self.average_waiting_times = []
         self.average_response_times = []
-        for scheduler in self.schedulers:
-            self.scheduler_names.append(scheduler.name)
-            details = scheduler.run()
-            results = calculateMetrics(details["state"], self.process_data)
-            average_waiting_time, average_response_time = calculatePerformance(results)
-            self.average_waiting_times.append(average_waiting_time)
-            self.average_response_times.append(average_response_time)
+        self.workload = workloadOf(self.processes).share()
+        self.executor = ProcessPoolExecutor(max_workers=min(len(self.schedulers), os.cpu_count() or 1) or 1)
+        self.pending_results = [self.executor.submit(runJob, job + (self.workload,)) for job in self.schedulers]
+        self.after(50, self.collectPerformance)
+
+    def collectPerformance(self):
+        # The workers and the shared workload are released once every result is in, or once one failed
+        done = True
+        try:
+            finished = [future for future in self.pending_results if future.done()]
+            for future in finished:
+                self.pending_results.remove(future)
+                name, average_waiting_time, average_response_time = future.result()
+                self.scheduler_names.append(name)
+                self.average_waiting_times.append(average_waiting_time)
+                self.average_response_times.append(average_response_time)
+            if finished:
+                self.frames[SCFinalFrame].updatePlot()
+            done = not self.pending_results
+        except Exception as error:
+            messagebox.showerror("Statistical Comparison", f"A scheduler failed: {error}")
+        finally:
+            if done:
+                self.pending_results = []
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.workload.close()
+            else:
+                self.after(50, self.collectPerformance)
     
 class InitialFrame(tk.Frame):
     def __init__(self, parent, controller) -> None:
@@ -248,6 +244,10 @@ class InitialFrame(tk.Frame):
                                     command=lambda: self.goToSimFrame(controller))
         simulation_button.pack(pady=10, padx=10)
 
+        replay_button = ttk.Button(self, text="Replay Trace",
+                                    command=lambda: self.goToReplayFrame(controller))
+        replay_button.pack(pady=10, padx=10)
+
     def goToStatsFrame(self, controller) -> None:
         stack = Stack()
         stack.push(Process(0, 10, name="P1"))
@@ -260,6 +260,19 @@ class InitialFrame(tk.Frame):
     def goToSimFrame(self, controller) -> None:
         controller.showFrame(StartFrame)
 
+    def goToReplayFrame(self, controller) -> None:
+        path = filedialog.askopenfilename(filetypes=[("Trace files", "*.trace")])
+        if not path:
+            return
+        try:
+            controller.replayTrace(path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Replay Trace", str(error))
+            return
+        controller.frames[FinalFrame].counter = 0
+        controller.frames[FinalFrame].displayFrame()
+        controller.showFrame(FinalFrame)
+
 class StartFrame(tk.Frame):
     """Class for the StartFrame.
 
@@ -727,19 +740,19 @@ class FinalFrame(tk.Frame):
 
     def step(self):
         self.counter += 1
-        if self.counter == len(self.controller.past_details):
+        if self.counter == self.controller.historyLength():
             if self.controller.step():
-                saveGanttChart(self.controller.past_details[self.counter], self.ax, self.canvas)
+                self.controller.drawHistory(self.counter, self.chart)
             else:
                 self.counter -= 1
                 messagebox.showinfo('Simulation', 'Simulation has finished')
         else:
-            saveGanttChart(self.controller.past_details[self.counter], self.ax, self.canvas)
+            self.controller.drawHistory(self.counter, self.chart)
     
     def back(self):
         if self.counter > 0:
             self.counter -= 1
-            saveGanttChart(self.controller.past_details[self.counter], self.ax, self.canvas)
+            self.controller.drawHistory(self.counter, self.chart)
 
     def changeSchedule(self):
         if self.controller.finished:
@@ -754,25 +767,37 @@ class FinalFrame(tk.Frame):
                 self.controller.queue.push(self.controller.scheduler.queue.pop())
         if self.controller.scheduler_name in ['SJF', 'Round-Robin']:
             self.controller.waiting_processes = self.controller.scheduler.waiting_processes
-        self.controller.prev_details = self.controller.scheduler.details
+        self.controller.prev_trace = self.controller.scheduler.trace
+        self.controller.prev_accumulators = self.controller.scheduler.accumulators
+        self.controller.prev_last_state = self.controller.scheduler.last_state
+        self.controller.prev_context_switches = self.controller.scheduler.context_switches
         self.controller.showFrame(REStartFrame)
 
     def run(self):
-        while self.controller.step():
-            continue
-        self.counter = len(self.controller.past_details) - 1
-        saveGanttChart(self.controller.past_details[self.counter], self.ax, self.canvas)
+        self.controller.run()
+        self.counter = self.controller.historyLength() - 1
+        self.controller.drawHistory(self.counter, self.chart)
 
     def metrics(self):
-        if not self.controller.finished:
-            messagebox.showinfo('Simulation', 'Simulation has not finished')
+        # The scheduler keeps the metrics up to date while stepping, so they can be shown at any time,
+        # with a dash for what is not known yet
+        results = self.controller.scheduler.metrics()
+        if not results:
+            messagebox.showinfo('Simulation', 'No process has arrived yet')
             return
-        if not self.controller.results:
-            self.controller.calculateAllMetrics()
-        for process in self.controller.results:
-            messagebox.showinfo(process, f"Arrival time: {self.controller.results[process][0]}\nFirst turn in: {self.controller.results[process][1]}\nFinish time: {self.controller.results[process][2]}\nBurst time: {self.controller.results[process][3]}\nWaiting time: {self.controller.results[process][4]}\nResponse time: {self.controller.results[process][5]}\nTurnaround time: {self.controller.results[process][6]}")
+        for process, result in results.items():
+            result = {metric: '-' if value is None else value for metric, value in result.items()}
+            messagebox.showinfo(process, f"Arrival time: {result['arrival_time']}\nFirst turn in: {result['first_run']}\nFinish time: {result['completion_time']}\nBurst time: {result['burst_time']}\nWaiting time: {result['waiting_time']}\nResponse time: {result['response_time']}\nTurnaround time: {result['turnaround_time']}\nDispatches: {result['dispatches']}")
     
+    def saveTrace(self):
+        path = filedialog.asksaveasfilename(defaultextension=".trace", filetypes=[("Trace files", "*.trace")])
+        if path:
+            self.controller.saveTrace(path)
+
     def modify(self):
+        if self.controller.scheduler_name == "Replay":
+            messagebox.showinfo('Replay', 'The processes of a replayed trace can not be modified')
+            return
         self.controller.showFrame(ModifyProcessFrame)
     
     def goBack(self):
@@ -791,11 +816,20 @@ class FinalFrame(tk.Frame):
         # self.photo_label = ttk.Label(self.frame1, image=self.photo)
         # self.photo_label.pack(fill="both", expand=True)
         # self.photo_label.image = self.photo
+        # matplotlib is only loaded once a chart is shown
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from gantt import ZoomableGanttChart
+
         self.fig, self.ax = plt.subplots(figsize=(15, 8))
         self.canvas = FigureCanvasTkAgg(self.fig, 
                                 master = self.frame1)   
-        saveGanttChart(self.controller.past_details[self.counter], self.ax, self.canvas)
+        self.chart = ZoomableGanttChart(self.ax, self.canvas)
+        self.controller.drawHistory(self.counter, self.chart)
         self.canvas.draw() 
+        # Zooming and panning long schedules draws the visible window in more detail
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self.frame1)
+        self.toolbar.update()
         self.canvas.get_tk_widget().pack() 
 
         # Create Frame 2 which will have some buttons
@@ -828,8 +862,11 @@ class FinalFrame(tk.Frame):
         button6 = ttk.Button(self.frame2, text="Metrics", command=self.metrics)
         button6.pack(pady=10)
 
-        button7 = ttk.Button(self.frame2, text="Return", command=self.goBack)
+        button7 = ttk.Button(self.frame2, text="Save Trace", command=self.saveTrace)
         button7.pack(pady=10)
+
+        button8 = ttk.Button(self.frame2, text="Return", command=self.goBack)
+        button8.pack(pady=10)
         pass
 
 class ModifyProcessFrame(tk.Frame):
@@ -1115,9 +1152,7 @@ class REProcessConfigFrame(tk.Frame):
                 self.controller.showFrame(RECustomProcessCreationFrame)
             else:
                 processes = initializeProcessStack(min_arrival_time=self.controller.time_step + 1, max_arrival_time=self.controller.time_step + 30, num_processes=int(self.num_processes_entry.get()))
-                for process in processes.items:
-                    self.controller.scheduler.process_stack.items.append(process)
-                self.controller.scheduler.process_stack.sort()
+                self.controller.scheduler.arrivals.pushAll(processes.items)
                 details = getProcessData(processes)
                 for data in details:
                     self.controller.process_data[data] = details[data]
@@ -1174,7 +1209,7 @@ class RECustomProcessCreationFrame(tk.Frame):
             self.next_process_button.pack_forget()
             process = Process(arrival_time=arrival_time,
                                                     duration=int(self.process_frames[self.current_process_index][2].get()))
-            self.controller.scheduler.process_stack.push(process)
+            self.controller.scheduler.arrivals.push(process)
             self.processes.push(process)
             # Move to the next process
             self.current_process_index = (self.current_process_index + 1)
@@ -1193,9 +1228,8 @@ class RECustomProcessCreationFrame(tk.Frame):
         try:
             process = Process(arrival_time=int(self.process_frames[self.current_process_index][1].get()),
                                         duration=int(self.process_frames[self.current_process_index][2].get()))
-            self.controller.scheduler.process_stack.push(process)
+            self.controller.scheduler.arrivals.push(process)
             self.processes.push(process)
-            self.controller.scheduler.process_stack.sort()
             details = getProcessData(self.processes)
             for data in details:
                 self.controller.process_data[data] = details[data]
@@ -1210,7 +1244,7 @@ class RemoveProcesses(tk.Frame):
         self.names = []
 
     def start(self):
-        self.process_stack = self.controller.scheduler.process_stack.items
+        self.process_stack = self.controller.scheduler.arrivals.items
         for process in self.process_stack:
             self.names.append(process.name)
         self.selected_name = tk.StringVar()
@@ -1239,7 +1273,7 @@ class RemoveProcesses(tk.Frame):
             self.names.remove(self.selected_name.get())
             for i in range(len(self.process_stack)):
                 if self.process_stack[i].name == self.selected_name.get():
-                    del self.process_stack[i]
+                    self.controller.scheduler.arrivals.remove(self.process_stack.pop(i))
                     break
             self.build_radio_buttons()
         except ValueError:
@@ -1247,8 +1281,6 @@ class RemoveProcesses(tk.Frame):
     
     def proceed(self):
         self.controller.showFrame(FinalFrame)
-        self.controller.scheduler.process_stack.items = self.process_stack
-        self.controller.scheduler.process_stack.sort()
 
 class SCStartFrame(tk.Frame):
     """Class for the StartFrame.
@@ -1283,18 +1315,8 @@ class SCStartFrame(tk.Frame):
 
     def goToFrame(self, controller) -> None:
             selection = self.algorithm.get()
-            if selection == "FCFS":
-                stack = customProcessStack()
-                controller.schedulers.append(FCFS(stack))
-                controller.showFrame(SCStartFrame)
-            elif selection == "SJF":
-                stack = customProcessStack()
-                controller.schedulers.append(SJF(stack))
-                controller.showFrame(SCStartFrame)
-            elif selection == "SRTF":
-                stack = customProcessStack()
-                stack.items = controller.processes.items.copy()
-                controller.schedulers.append(SRTF(stack))
+            if selection in ("FCFS", "SJF", "SRTF"):
+                controller.addComparison(selection)
                 controller.showFrame(SCStartFrame)
             elif selection == "Round-Robin":
                 controller.showFrame(SCRoundRobinFrame)
@@ -1324,8 +1346,7 @@ class SCRoundRobinFrame(tk.Frame):
 
     def proceed(self) -> None:
         try:
-            stack = customProcessStack()
-            self.controller.schedulers.append(RoundRobin(stack, int(self.quantum.get())))
+            self.controller.addComparison("Round-Robin", {"quantum": int(self.quantum.get())})
             self.controller.showFrame(SCStartFrame)
         except:
             messagebox.showerror("Incorrect Input", "Please enter valid inputs")
@@ -1450,11 +1471,9 @@ class SCMLFQConfigFrame(tk.Frame):
             else:
                 self.levels.append(Queue())
                 self.quanta.append(100000)
-            stack = customProcessStack()
-            self.controller.schedulers.append(MLFQ(stack,
-                                                quanta=self.quanta, structure=self.levels,
-                                                pre_emptive=self.controller.frames[SCMLFQFrame].pre_emptive,
-                                                boost_time=self.controller.frames[SCMLFQFrame].boost_time))
+            self.controller.addComparison("MLFQ", {"quanta": self.quanta, "structure": self.levels,
+                                                   "pre-emptive": self.controller.frames[SCMLFQFrame].pre_emptive,
+                                                   "boost_time": self.controller.frames[SCMLFQFrame].boost_time})
             self.controller.showFrame(SCStartFrame)
         except:
             messagebox.showerror("Incorrect Input", "Please enter valid inputs")
@@ -1467,6 +1486,14 @@ class SCFinalFrame(tk.Frame):
     def back(self):
         pass
 
+    def updatePlot(self):
+        # Redraws the plot with the schedulers that finished so far
+        self.ax.clear()
+        if self.controller.scheduler_names:
+            savePerformancePlot(self.controller.scheduler_names, self.controller.average_waiting_times, self.controller.average_response_times, self.ax, self.canvas)
+        else:
+            self.canvas.draw()
+
     def displayFrame(self):
         # self.controller.past_details.append(image)
         self.frame_ratio = [8, 1]
@@ -1480,11 +1507,13 @@ class SCFinalFrame(tk.Frame):
         # self.photo_label = ttk.Label(self.frame1, image=self.photo)
         # self.photo_label.pack(fill="both", expand=True)
         # self.photo_label.image = self.photo
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         self.fig, self.ax = plt.subplots(figsize=(15, 8))
         self.canvas = FigureCanvasTkAgg(self.fig, 
                                 master = self.frame1)   
-        savePerformancePlot(self.controller.scheduler_names, self.controller.average_waiting_times, self.controller.average_response_times, self.ax, self.canvas)
-        self.canvas.draw() 
+        self.updatePlot()
         self.canvas.get_tk_widget().pack() 
 
         # Create Frame 2 which will have some buttons
@@ -1608,5 +1637,6 @@ def customProcessStack():
     stack.sort()
     return stack
 
-app = SchedulerApp()
-app.mainloop()
+if __name__ == "__main__":
+    app = SchedulerApp()
+    app.mainloop()
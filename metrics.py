@@ -0,0 +1,166 @@
+import numpy as np
+from trace_ import Trace
+
+PERFORMANCE_METRICS = ("waiting", "response", "turnaround", "slowdown")
+
+def traceArrays(trace: Trace) -> tuple:
+    """
+    Gets the segments of a trace as NumPy arrays, without copying them
+
+    Returns:
+        tuple(np.ndarray): The state id, start and length of every segment
+    """
+    if isinstance(trace.ids, np.ndarray):
+        # Memory-mapped trace file
+        return trace.ids, trace.starts, trace.lengths
+    return (np.frombuffer(trace.ids, dtype=trace.ids.typecode),
+            np.frombuffer(trace.starts, dtype=trace.starts.typecode),
+            np.frombuffer(trace.lengths, dtype=trace.lengths.typecode))
+
+def encodeStates(states) -> tuple:
+    """
+    Run-length encodes the state of the CPU at every time step
+
+    Arguments:
+    states (list/np.ndarray): The state names, or integer state ids, at every time step
+
+    Example usage:
+    >>> encodeStates(['idle', 'P1', 'P1', 'P2'])
+        (['idle', 'P1', 'P2'], array([0, 1, 2]), array([0, 1, 3]), array([1, 2, 1]))
+
+    Returns:
+        tuple: The state names (None for integer states), and the state id, start and length of every segment
+    """
+    if isinstance(states, np.ndarray) and states.dtype.kind in "iu":
+        names, codes = None, states
+    else:
+        names, codes = np.unique(np.asarray(states), return_inverse=True)
+        names = names.tolist()
+    if not len(codes):
+        empty = np.zeros(0, dtype=np.int64)
+        return names, empty, empty, empty
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+    lengths = np.diff(np.append(starts, len(codes)))
+    return names, codes[starts], starts, lengths
+
+def computeMetrics(data, processes_details: dict, names: list = None) -> dict:
+    """
+    Calculates the metrics of every process that ran, in a few vectorized passes over the segments of a schedule
+
+    Arguments:
+    data (Trace/list/np.ndarray): Trace, or list or integer-encoded array of the states at every time step of a scheduler
+    processes_details (dict): The arrival time and duration of each process, as made by getProcessData
+    names (list): The state name of each id, when data is a NumPy array of integer state ids
+
+    Example usage:
+    >>> computeMetrics(trace, {'P1': [0, 2], 'P2': [1, 1]})
+        {'names': ['P1', 'P2'], 'arrival': array([0, 1]), 'burst': array([2, 1]), 'first_run': array([0, 2]), ...}
+
+    Returns:
+        dict: The names of the processes in the order they first ran, NumPy arrays of their arrival, burst,
+        first_run, completion, waiting, response, turnaround and slowdown, and the cpu_utilization
+    """
+    if isinstance(data, Trace):
+        names = data.names
+        ids, starts, lengths = traceArrays(data)
+        duration = data.duration
+    else:
+        state_names, ids, starts, lengths = encodeStates(data)
+        names = state_names if state_names is not None else names
+        duration = len(data)
+
+    idle_ids = [state_id for state_id, name in enumerate(names) if name == "idle"]
+    busy = ~np.isin(ids, idle_ids)
+    ids, starts, lengths = ids[busy], starts[busy], lengths[busy]
+
+    # Segments are in time order, so the first occurrence of an id is the first run of its process,
+    # and the first occurrence in the reversed segments is its last run
+    state_ids, first = np.unique(ids, return_index=True)
+    last = len(ids) - 1 - np.unique(ids[::-1], return_index=True)[1]
+    order = np.argsort(first, kind="stable")
+    state_ids, first, last = state_ids[order], first[order], last[order]
+
+    process_names = [names[state_id] for state_id in state_ids.tolist()]
+    arrival = np.array([processes_details[name][0] for name in process_names], dtype=np.int64)
+    burst = np.array([processes_details[name][1] for name in process_names], dtype=np.int64)
+    first_run = starts[first].astype(np.int64)
+    completion = (starts[last] + lengths[last]).astype(np.int64)
+    turnaround = completion - arrival
+    response = first_run - arrival
+    waiting = turnaround - burst
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slowdown = turnaround / burst
+
+    return {"names": process_names,
+            "arrival": arrival,
+            "burst": burst,
+            "first_run": first_run,
+            "completion": completion,
+            "waiting": waiting,
+            "response": response,
+            "turnaround": turnaround,
+            "slowdown": slowdown,
+            "cpu_utilization": float(lengths.sum() / duration) if duration else 0.0}
+
+def summarizeMetrics(metrics: dict, percentiles: tuple = (50, 95, 99)) -> dict:
+    """
+    Summarizes the waiting, response, turnaround and slowdown of all the processes
+
+    Example usage:
+    >>> summarizeMetrics(computeMetrics(trace, process_data))
+        {'waiting': {'mean': 4.5, 'p50': 4.0, 'p95': 9.1, 'p99': 9.8}, ..., 'cpu_utilization': 0.93}
+
+    Returns:
+        dict: The mean and percentiles of each metric, and the cpu_utilization
+    """
+    summary = {}
+    for metric in PERFORMANCE_METRICS:
+        values = metrics[metric]
+        summary[metric] = {"mean": float(values.mean()) if len(values) else float("nan")}
+        if len(values):
+            for percentile, value in zip(percentiles, np.percentile(values, percentiles).tolist()):
+                summary[metric][f"p{percentile}"] = value
+        else:
+            for percentile in percentiles:
+                summary[metric][f"p{percentile}"] = float("nan")
+    summary["cpu_utilization"] = metrics["cpu_utilization"]
+    return summary
+
+def metricsToDetails(metrics: dict) -> dict:
+    """
+    Converts the metrics into the dictionary returned by calculateMetrics
+
+    Returns:
+        dict(str, list): The arrival, first run, completion, burst, waiting, response and turnaround time of each process
+    """
+    columns = zip(metrics["arrival"].tolist(), metrics["first_run"].tolist(), metrics["completion"].tolist(),
+                  metrics["burst"].tolist(), metrics["waiting"].tolist(), metrics["response"].tolist(),
+                  metrics["turnaround"].tolist())
+    return {name: list(values) for name, values in zip(metrics["names"], columns)}
+
+# Benchmark
+if __name__ == "__main__":
+    from timeit import timeit
+    from fcfs import FCFS
+    from rr import RoundRobin
+    from scheduler import processesOf, workloadOf
+    from utils import initializeProcessStack
+
+    def loopMetrics(trace: Trace, processes_details: dict) -> dict:
+        occurrences = {}
+        for process, level, start, length in trace.segments():
+            if process != 'idle':
+                if process not in occurrences:
+                    occurrences[process] = [start, None]
+                occurrences[process][1] = start + length - 1
+        return occurrences
+
+    workload = workloadOf(initializeProcessStack(num_processes=20000, max_arrival_time=100000))
+    process_data = workload.processData()
+    print("Scheduler\tSegments\tLoop (s)\tVectorized (s)")
+    for name, scheduler in (("FCFS", FCFS(processesOf(workload))), ("RR", RoundRobin(processesOf(workload), 1))):
+        trace = scheduler.run()
+        loop_time = timeit(lambda: loopMetrics(trace, process_data), number=1)
+        vectorized_time = timeit(lambda: computeMetrics(trace, process_data), number=1)
+        print(f"{name}\t\t{len(trace.ids)}\t\t{loop_time:.4f}\t\t{vectorized_time:.4f}")
+    print(summarizeMetrics(computeMetrics(trace, process_data)))
@@ -2,15 +2,17 @@ from process import *
 from queue_ import Queue
 from stack import Stack
 from utils import *
+from engine import Scheduler
+import math
 
-class MLFQ:
+class MLFQ(Scheduler):
     """
     The MLFQ (Multi-Level Feedback Queue) class implements a scheduler using multiple levels of queues 
     with different priorities. It is designed to manage processes with varying resource requirements 
     and execution characteristics.
 
     Attributes:
-        process_stack (Stack): A stack of all initialized processes.
+        arrivals (ArrivalQueue): The initialized processes that did not arrive yet.
         structure (list): A list of each level structure
         num_levels (int): Number of priority levels in the MLFQ.
         quanta (list): A list of quanta of each level
@@ -31,18 +33,16 @@ class MLFQ:
             quanta (list): A list of quanta of each level
             boost_time (int): Time interval for boosting process priority.
         """
+        super().__init__(process_stack)
         MLFQ.counter += 1
         self.name = f"MLFQ: {MLFQ.counter}"
-        self.process_stack = process_stack
         self.structure = structure
         self.num_levels = len(structure)
         self.quanta = quanta
         self.boost_time = boost_time
-        self.time_step = 0
         self.prev_level = 0
         self.pre_emptive = pre_emptive
         self.previous_process = None
-        self.details = {"state": [], "level":[]}
         self.info = {'CurrentRunningProcess': '', 'CurrentLevel': '', 'finished': [], 'finish_time': []}
     
     def boost(self) -> None:
@@ -56,7 +56,12 @@ class MLFQ:
             while self.structure[i].peak() != None:
                 process = self.structure[i].pop()
                 process.quantum = self.quanta[0]
-                self.structure[0].push(process)
+                if not self.pre_emptive and process is self.previous_process:
+                    # The running process keeps the CPU, now from the top level
+                    self.structure[0].pushFront(process)
+                    self.prev_level = 0
+                else:
+                    self.structure[0].push(process)
 
     def getProcess(self) -> (Process, int):
         """
@@ -75,15 +80,25 @@ class MLFQ:
             return self.previous_process, self.prev_level
         return None, None
         
-    def step(self) -> bool:
+    def untilNextBoost(self) -> int:
         """
-        Executes a single time step in the MLFQ simulation. 
+        Checks how many time steps are left until the next boost.
+
+        Returns:
+            int: Time steps until the next boost.
+        """
+        return math.ceil((self.time_step // self.boost_time + 1) * self.boost_time - self.time_step)
+
+    def advance(self, limit: int = None) -> bool:
+        """
+        Executes the time steps up to the next scheduling event (arrival, quantum expiry,
+        completion or boost) in the MLFQ simulation, or at most limit time steps.
         This involves processing arrivals, handling I/O, and scheduling processes.
 
         Returns:
             bool: True if the simulation should continue, False otherwise.
         """
-        self.arrived_processes = getArrivedProcesses(self.process_stack, self.time_step)
+        self.arrived_processes = self.admitArrivals()
         for process in self.arrived_processes:
             process.quantum = self.quanta[0]
             self.structure[0].push(process)
@@ -99,7 +114,9 @@ class MLFQ:
                 condition = False
                 self.info["CurrentRunningProcess"] = process.name
                 process.state = ProcessState.RUNNING
-                process.decrementDuration()
+                length = self.spanLength(limit, process.duration, process.quantum or 1,
+                                         self.untilNextArrival(), self.untilNextBoost())
+                process.decrementDuration(length)
                 self.previous_process = process
                 self.info["CurrentLevel"] = level
                 self.prev_level = level
@@ -114,28 +131,24 @@ class MLFQ:
                             process.quantum = self.quanta[level]
                             self.structure[level].push(process)
                         else:
+                            self.structure[level].pop()
+                            process.quantum = self.quanta[level]
                             self.structure[level].push(process)
                 else:
                     self.info['finished'].append(process.name)
-                    self.info['finish_time'].append(self.time_step)
+                    self.info['finish_time'].append(self.time_step + length - 1)
                     self.structure[level].pop()
                     self.previous_process = None
-            elif not self.process_stack.isEmpty():
+            elif not self.arrivals.isEmpty():
                 condition = False
                 self.info["CurrentRunningProcess"] = "idle"
                 self.info["CurrentLevel"] = self.prev_level
+                length = self.spanLength(limit, self.untilNextArrival())
             else:
                 return False
-        self.time_step += 1
-        self.details["state"].append(self.info["CurrentRunningProcess"])
-        self.details["level"].append(self.info["CurrentLevel"])
+        self.record(self.info["CurrentRunningProcess"], self.info["CurrentLevel"], length)
         return True
 
-    def run(self):
-        while(self.step()):
-            continue
-        return self.details
-    
 # Debug    
 if __name__ == "__main__":
     stack = Stack()
@@ -0,0 +1,198 @@
+"""
+Warm worker pool for batches of simulations
+
+The workers are started once from a forkserver that already imported the schedulers, and all of
+them read the same copy of the workload, shared in memory. Jobs are then sent over a queue in chunks, and
+every simulation comes back as a compact tuple of averages, so the cost of a job is the simulation
+itself and thousands of small simulations run every second.
+
+Example usage:
+>>> with SimulationPool(workloadOf(stack)) as pool:
+...     results = pool.map([("Round-Robin", {"quantum": quantum}) for quantum in range(1, 100)])
+>>> results[0]
+    (12.5, 3.25, 20.0, 0.95)
+"""
+import multiprocessing
+import os
+import queue
+from queue_ import Queue
+from scheduler import createScheduler, processesOf
+
+# Modules imported by the forkserver, so that every worker starts with them already loaded
+PRELOAD = ["engine", "fcfs", "sjf", "srtf", "rr", "mlfq", "lottery", "scheduler", "workload", "pool"]
+
+# The fields of the result of every simulation
+RESULT_FIELDS = ("average_waiting_time", "average_response_time", "average_turnaround_time", "cpu_utilization")
+
+def getContext():
+    """
+    Gets the forkserver multiprocessing context, or spawn where there is no forkserver
+
+    Returns:
+        multiprocessing.context.BaseContext: The context of the workers
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
+
+def simulate(workload, scheduler_name: str, configurations: dict) -> tuple:
+    """
+    Runs a scheduler on a new run of the workload, with the metrics of the scheduler instead of its trace
+
+    Arguments:
+    workload (Workload): The workload to schedule
+    scheduler_name (str): One of FCFS, SJF, SRTF, Round-Robin, MLFQ, Lottery and Stride
+    configurations (dict): The configurations of the scheduler, as for createScheduler.
+                           The MLFQ structure is made from its quanta when it is not given, and Lottery
+                           only gives the same results on every run with its own generator.
+
+    Returns:
+        tuple: The average waiting, response and turnaround times, and the CPU utilization, as in RESULT_FIELDS
+    """
+    if "quanta" in configurations and "structure" not in configurations:
+        configurations = dict(configurations, quanta=list(configurations["quanta"]),
+                              structure=[Queue() for _ in configurations["quanta"]])
+    scheduler = createScheduler(scheduler_name, processesOf(workload), configurations)
+    scheduler.run()
+    count = waiting_time = response_time = turnaround_time = run_time = 0
+    for accumulator in scheduler.accumulators.values():
+        if accumulator.first_run is None:
+            continue
+        count += 1
+        turnaround = accumulator.last_end - accumulator.arrival_time
+        waiting_time += turnaround - accumulator.burst_time
+        response_time += accumulator.first_run - accumulator.arrival_time
+        turnaround_time += turnaround
+        run_time += accumulator.run_time
+    if not count:
+        return 0.0, 0.0, 0.0, 0.0
+    return (waiting_time / count, response_time / count, turnaround_time / count,
+            run_time / scheduler.time_step if scheduler.time_step else 0.0)
+
+def work(workload, jobs, results) -> None:
+    """
+    Runs the chunks of jobs of the queue until it gets None, in a worker
+
+    Arguments:
+    workload (Workload): The workload of the pool
+    jobs (multiprocessing.SimpleQueue): Chunks of (job id, scheduler name, configurations)
+    results (multiprocessing.Queue): The (job id, result) pairs of every chunk, with the error of a failed chunk as result
+
+    Returns:
+        None
+    """
+    while True:
+        chunk = jobs.get()
+        if chunk is None:
+            return
+        try:
+            results.put([(job_id, simulate(workload, scheduler_name, configurations))
+                         for job_id, scheduler_name, configurations in chunk])
+        except Exception as error:
+            results.put([(job_id, error) for job_id, scheduler_name, configurations in chunk])
+
+class SimulationPool:
+    """
+    Persistent pool of worker processes running simulations of one workload
+
+    Attributes:
+        workload (SharedWorkload): The workload every simulation runs on, shared with the workers
+        owns_workload (bool): Whether the pool shared the workload, and unlinks it when closed
+        workers (list): The worker processes
+        jobs (multiprocessing.SimpleQueue): The chunks of jobs waiting for a worker
+        results (multiprocessing.Queue): The results of the finished chunks
+    """
+    def __init__(self, workload, max_workers: int = None) -> None:
+        context = getContext()
+        self.workload = workload.share()
+        self.owns_workload = self.workload is not workload
+        self.jobs = context.SimpleQueue()
+        self.results = context.Queue()
+        self.workers = [context.Process(target=work, args=(self.workload, self.jobs, self.results), daemon=True)
+                        for _ in range(max_workers or os.cpu_count() or 1)]
+        for worker in self.workers:
+            worker.start()
+
+    def map(self, jobs: list, chunk_size: int = None) -> list:
+        """
+        Runs simulations in the workers
+
+        Arguments:
+        jobs (list): The (scheduler name, configurations) of every simulation
+        chunk_size (int): The number of jobs sent to a worker at once, by default a few chunks per worker
+
+        Returns:
+            list(tuple): The result of every job, in the order of the jobs, as in RESULT_FIELDS
+        """
+        jobs = [(job_id, scheduler_name, configurations) for job_id, (scheduler_name, configurations) in enumerate(jobs)]
+        chunk_size = chunk_size or max(len(jobs) // (4 * len(self.workers)), 1)
+        for start in range(0, len(jobs), chunk_size):
+            self.jobs.put(jobs[start:start + chunk_size])
+        results = [None] * len(jobs)
+        remaining = len(jobs)
+        while remaining:
+            try:
+                chunk = self.results.get(timeout=1)
+            except queue.Empty:
+                if not all(worker.is_alive() for worker in self.workers):
+                    self.close()
+                    raise RuntimeError("a simulation worker stopped unexpectedly")
+                continue
+            for job_id, result in chunk:
+                results[job_id] = result
+            remaining -= len(chunk)
+        # The results of every chunk are collected first, so a failed job leaves no stale results behind
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def close(self) -> None:
+        """
+        Stops the workers once they finish their jobs, and unlinks the workload if the pool shared it
+
+        Returns:
+            None
+        """
+        for worker in self.workers:
+            if worker.is_alive():
+                self.jobs.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+        if self.owns_workload:
+            self.workload.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+# Benchmark
+if __name__ == "__main__":
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    from scheduler import workloadOf
+    from utils import initializeProcessStack
+
+    def perJob(function, jobs: list) -> float:
+        start = time.perf_counter()
+        function(jobs)
+        return (time.perf_counter() - start) / len(jobs) * 1e6
+
+    jobs = [("Round-Robin", {"quantum": quantum % 8 + 1}) for quantum in range(5000)]
+    print("Processes\tIn process (us)\tPool (us)\tProcessPoolExecutor (us)")
+    for num_processes in (1, 20):
+        workload = workloadOf(initializeProcessStack(num_processes=num_processes))
+        in_process = perJob(lambda jobs: [simulate(workload, *job) for job in jobs], jobs)
+        with SimulationPool(workload) as pool:
+            pool.map(jobs[:100])
+            pooled = perJob(pool.map, jobs)
+        with ProcessPoolExecutor() as executor:
+            executor_time = perJob(lambda jobs: list(executor.map(simulate, [workload] * len(jobs), *zip(*jobs))), jobs)
+        print(f"{num_processes}\t\t{in_process:.0f}\t\t{pooled:.0f}\t\t{executor_time:.0f}")
@@ -5,13 +5,19 @@ class PriorityQueue:
     """
     Implementation of a priority queue
 
+    Every process is stored once in a [duration, order, process] entry, where order is
+    the position in which it was pushed, so ties are broken by arrival order with integer
+    comparisons, and the key of the running process can be decreased in place.
+
     Attributes:
         heap (list): The heap of the priority queue
         quantum (int): The time step of the priority queue
+        order (int): The number of processes pushed so far
     """
     def __init__(self, quantum:int = None) -> None:
         self.heap = []
         self.quantum = quantum
+        self.order = 0
 
     def push(self, process:Process) -> None:
         """
@@ -20,7 +26,8 @@ class PriorityQueue:
         Returns:
             None
         """
-        heapq.heappush(self.heap, (process.duration, process))
+        self.order += 1
+        heapq.heappush(self.heap, [process.duration, self.order, process])
 
     def pop(self) -> Process:
         """
@@ -29,7 +36,7 @@ class PriorityQueue:
         Returns:
             Process: Highest priority process in the priority queue
         """
-        return heapq.heappop(self.heap)[1] if self.heap else None
+        return heapq.heappop(self.heap)[2] if self.heap else None
 
     def peak(self) -> Process:
         """
@@ -38,7 +45,22 @@ class PriorityQueue:
         Returns:
             Process: Highest priority process in the priority queue
         """
-        return self.heap[0][1] if self.heap else None
+        return self.heap[0][2] if self.heap else None
+
+    def updatePeak(self) -> None:
+        """
+        Updates the key of the highest priority process after its duration changed.
+        A decreased duration keeps it on top, so only an increase needs to move it.
+
+        Returns:
+            None
+        """
+        if self.heap:
+            entry = self.heap[0]
+            increased = entry[2].duration > entry[0]
+            entry[0] = entry[2].duration
+            if increased:
+                heapq.heapreplace(self.heap, entry)
     
     def isEmpty(self) -> bool:
         """
@@ -49,6 +71,155 @@ class PriorityQueue:
         """
         return len(self.heap) == 0
 
+class IndexedPriorityQueue(PriorityQueue):
+    """
+    Implementation of an addressable priority queue
+
+    It keeps the position of every process in the heap, so the key of any process can be
+    changed and any process can be removed in O(log n), not only the highest priority one.
+
+    Attributes:
+        heap (list): The heap of the priority queue
+        quantum (int): The time step of the priority queue
+        order (int): The number of processes pushed so far
+        positions (dict): The index of each process in the heap
+    """
+    def __init__(self, quantum:int = None) -> None:
+        super().__init__(quantum)
+        self.positions = {}
+
+    def siftUp(self, index: int) -> None:
+        """
+        Moves an entry up until its parent has a higher priority
+
+        Returns:
+            None
+        """
+        heap = self.heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if entry < heap[parent]:
+                heap[index] = heap[parent]
+                self.positions[heap[index][2]] = index
+                index = parent
+            else:
+                break
+        heap[index] = entry
+        self.positions[entry[2]] = index
+
+    def siftDown(self, index: int) -> None:
+        """
+        Moves an entry down until its children have a lower priority
+
+        Returns:
+            None
+        """
+        heap = self.heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if heap[child] < entry:
+                heap[index] = heap[child]
+                self.positions[heap[index][2]] = index
+                index = child
+            else:
+                break
+        heap[index] = entry
+        self.positions[entry[2]] = index
+
+    def push(self, process:Process) -> None:
+        """
+        Pushes a process into the priority queue
+
+        Returns:
+            None
+        """
+        self.order += 1
+        self.heap.append([process.duration, self.order, process])
+        self.siftUp(len(self.heap) - 1)
+
+    def pushAll(self, processes: list) -> None:
+        """
+        Pushes a batch of processes into the priority queue, heapifying everything at once
+        when the batch is large compared to the heap
+
+        Returns:
+            None
+        """
+        if len(processes) * 4 < len(self.heap):
+            for process in processes:
+                self.push(process)
+            return
+        for process in processes:
+            self.order += 1
+            self.heap.append([process.duration, self.order, process])
+        heapq.heapify(self.heap)
+        self.positions = {entry[2]: index for index, entry in enumerate(self.heap)}
+
+    def removeAt(self, index: int) -> Process:
+        """
+        Removes the entry at an index of the heap
+
+        Returns:
+            Process: The removed process
+        """
+        entry = self.heap[index]
+        last = self.heap.pop()
+        del self.positions[entry[2]]
+        if index < len(self.heap):
+            self.heap[index] = last
+            self.siftDown(index)
+            self.siftUp(self.positions[last[2]])
+        return entry[2]
+
+    def pop(self) -> Process:
+        """
+        Pops a process from the priority queue
+
+        Returns:
+            Process: Highest priority process in the priority queue
+        """
+        return self.removeAt(0) if self.heap else None
+
+    def remove(self, process: Process) -> None:
+        """
+        Removes a process from the priority queue
+
+        Returns:
+            None
+        """
+        index = self.positions.get(process)
+        if index is not None:
+            self.removeAt(index)
+
+    def update(self, process: Process, new_key: int = None) -> None:
+        """
+        Changes the key of a process, by default to its current duration
+
+        Returns:
+            None
+        """
+        index = self.positions[process]
+        self.heap[index][0] = process.duration if new_key is None else new_key
+        self.siftDown(index)
+        self.siftUp(self.positions[process])
+
+    def updatePeak(self) -> None:
+        """
+        Updates the key of the highest priority process after its duration changed
+
+        Returns:
+            None
+        """
+        if self.heap:
+            self.update(self.heap[0][2])
+
 # Debug
 if __name__ == "__main__":
     process_1 = Process(1, 4, 0.2)
@@ -15,38 +15,58 @@ class Process:
     """
     Representation of a class
 
+    The attributes are kept in slots instead of a per-instance dictionary,
+    to keep large workloads small in memory.
+
     Attributes:
         pid (int): The PID of the process
         name (str): The name of the process
         arrival_time(int): When will the process arrive
         duration(int): How long the process should run
         state(int): The state of the process
+        priority(int): The priority of the process, None if it has none
         probability_io(float): The probability of the process to perform an I/O operation
 
     Static variable:
     pid_counter (int): Keeps track of how many processes there are and helps in giving names to each process
     """
 
+    __slots__ = ("pid", "_name", "arrival_time", "duration", "state", "tickets", "depends_on", "quantum", "priority",
+                 "__weakref__")
+
     pid_counter = 0
 
-    def __init__(self, arrival_time: int, duration: int, tickets: int = None, depends_on = None, name = None) -> None:
+    def __init__(self, arrival_time: int, duration: int, tickets: int = None, depends_on = None, name = None,
+                 priority: int = None) -> None:
         Process.pid_counter += 1
         self.pid = Process.pid_counter
-        if name:
-            self.name = name
-        else:
-            self.name = f"P{self.pid}"
+        self._name = name or None
         self.arrival_time = arrival_time
         self.duration = duration
         self.state = ProcessState.EMBRYO
         self.tickets = tickets
         self.depends_on = depends_on
         self.quantum = 0
+        self.priority = priority
+
+    @property
+    def name(self) -> str:
+        """
+        The name of the process, generated from the PID unless one was given
+        """
+        return self._name if self._name is not None else f"P{self.pid}"
 
-    def decrementDuration(self):
-        self.duration -= 1
+    @name.setter
+    def name(self, name: str) -> None:
+        self._name = name or None
+
+    def decrementDuration(self, time: int = 1):
+        self.duration -= time
         if self.quantum:
-            self.quantum -= 1     
+            self.quantum = max(self.quantum - time, 0)
 
     def __gt__(self, other):
-        return self.name > other.name
\ No newline at end of file
+        return self.name > other.name
+
+    def __lt__(self, other):
+        return self.name < other.name
\ No newline at end of file
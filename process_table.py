@@ -0,0 +1,187 @@
+import numpy as np
+from arrivals import ArrivalStream
+from process import Process, ProcessState
+
+class ProcessTable:
+    """
+    Implementation of a columnar process table
+
+    Every process is a row index into NumPy arrays instead of an object, so a large workload
+    costs a few bytes per process and whole columns can be processed at once. The PIDs are
+    reserved from the same counter as Process, and the names are generated from them on demand.
+    A run of the table keeps the duration left and the queue level of every process in the
+    remaining and level columns, and the schedulers see the rows through ProcessRow views
+    created only when the rows arrive.
+
+    Attributes:
+        pid (np.ndarray): The PID of each process
+        arrival (np.ndarray): The arrival time of each process
+        burst (np.ndarray): The total duration of each process
+        remaining (np.ndarray): The duration left of each process
+        tickets (np.ndarray): The tickets of each process, 0 if it has none
+        priority (np.ndarray): The priority of each process
+        level (np.ndarray): The queue level of each process
+    """
+    def __init__(self, arrival, burst, tickets=None, priority=None) -> None:
+        size = len(arrival)
+        self.pid = np.arange(Process.pid_counter + 1, Process.pid_counter + size + 1, dtype=np.int64)
+        Process.pid_counter += size
+        self.arrival = np.asarray(arrival)
+        self.burst = np.asarray(burst, dtype=np.int64)
+        self.remaining = self.burst.copy()
+        self.tickets = np.zeros(size, dtype=np.int64) if tickets is None else np.asarray(tickets, dtype=np.int64)
+        self.priority = np.zeros(size, dtype=np.int64) if priority is None else np.asarray(priority, dtype=np.int64)
+        self.level = np.zeros(size, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.pid)
+
+    def name(self, index: int) -> str:
+        """
+        Generates the name of a process
+
+        Returns:
+            str: The name of the process
+        """
+        return f"P{self.pid[index].item()}"
+
+    def processData(self) -> dict:
+        """
+        Gets the arrival time and duration of every process, as getProcessData does
+
+        Returns:
+            dict(str, list)
+        """
+        return {f"P{pid}": [arrival, burst] for pid, arrival, burst in
+                zip(self.pid.tolist(), self.arrival.tolist(), self.burst.tolist())}
+
+    def reset(self) -> None:
+        """
+        Restores the duration left of every process and puts them back on the first level, to run the table again
+
+        Returns:
+            None
+        """
+        self.remaining[:] = self.burst
+        self.level[:] = 0
+
+    def arrivals(self) -> ArrivalStream:
+        """
+        Starts a new run of the table: the columns of the run are reset, and the rows are
+        viewed as processes as they arrive
+
+        Returns:
+            ArrivalStream: The processes of the run, for a scheduler
+        """
+        self.reset()
+        return ArrivalStream(TableArrivals(self))
+
+class TableArrivals:
+    """
+    Iterator creating the views of the rows of a process table in arrival order, saved as its table and position
+
+    Attributes:
+        table (ProcessTable): The table of the rows
+        order (np.ndarray): The rows sorted by arrival time, keeping the order of rows arriving together
+        index (int): The position in order of the next row
+    """
+    __slots__ = ("table", "order", "index")
+
+    def __init__(self, table: ProcessTable) -> None:
+        self.table = table
+        self.order = table.arrival.argsort(kind="stable")
+        self.index = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.index >= len(self.order):
+            raise StopIteration
+        process = ProcessRow(self.table, self.order[self.index].item())
+        self.index += 1
+        return process
+
+class ProcessRow:
+    """
+    A view of a row of a process table with the attributes of a Process,
+    reading and writing the columns of the table
+
+    Attributes:
+        table (ProcessTable): The table of the process
+        index (int): The row of the process
+        arrival_time (int): When the process arrives
+        state (ProcessState): The state of the process
+        depends_on: The process it depends on
+        quantum (int): The time left of the quantum of the process
+    """
+    __slots__ = ("table", "index", "arrival_time", "state", "depends_on", "quantum", "__weakref__")
+
+    def __init__(self, table: ProcessTable, index: int) -> None:
+        self.table = table
+        self.index = index
+        self.arrival_time = table.arrival[index].item()
+        self.state = ProcessState.EMBRYO
+        self.depends_on = None
+        self.quantum = 0
+
+    @property
+    def pid(self) -> int:
+        return self.table.pid[self.index].item()
+
+    @property
+    def name(self) -> str:
+        return self.table.name(self.index)
+
+    @property
+    def duration(self) -> int:
+        return self.table.remaining[self.index].item()
+
+    @duration.setter
+    def duration(self, duration: int) -> None:
+        self.table.remaining[self.index] = duration
+
+    @property
+    def tickets(self) -> int:
+        return self.table.tickets[self.index].item() or None
+
+    @property
+    def priority(self) -> int:
+        return self.table.priority[self.index].item()
+
+    @property
+    def level(self) -> int:
+        return self.table.level[self.index].item()
+
+    @level.setter
+    def level(self, level: int) -> None:
+        self.table.level[self.index] = level
+
+    def decrementDuration(self, time: int = 1):
+        self.table.remaining[self.index] -= time
+        if self.quantum:
+            self.quantum = max(self.quantum - time, 0)
+
+    def __gt__(self, other):
+        return self.name > other.name
+
+    def __lt__(self, other):
+        return self.name < other.name
+
+# Benchmark
+if __name__ == "__main__":
+    import tracemalloc
+
+    def measure(build) -> float:
+        # The peak is reached once the whole workload is built, before it is freed
+        tracemalloc.start()
+        build()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak / 2**20
+
+    print("Processes\tProcess objects (MB)\tProcess table (MB)")
+    for num_processes in (10**4, 10**5, 10**6):
+        objects = measure(lambda: [Process(i, 5, 1) for i in range(num_processes)])
+        table = measure(lambda: ProcessTable(np.arange(num_processes), np.full(num_processes, 5)))
+        print(f"{num_processes}\t\t{objects:.1f}\t\t\t{table:.1f}")
@@ -1,23 +1,84 @@
+from collections import OrderedDict
 from process import Process
 
 class Queue:
     """
     Implementation of a queue
 
+    Every pushed process gets a handle that is smaller than all the handles in the queue
+    when pushed to the front, and larger than all of them when pushed to the back, so the
+    handles are always in queue order. The entries are kept in an ordered dictionary (a
+    doubly linked list in C), giving O(1) push and pop at both ends and O(1) removal by handle.
+
     Attributes:
-        items (list): The items of the queue
+        entries (OrderedDict): The processes of the queue keyed by their handle, in queue order
+        handles (dict): The handles of each process in the queue
     """
     def __init__(self) -> None:
-        self.items = []
+        self.entries = OrderedDict()
+        self.handles = {}
+        self.front_handle = 0
+        self.back_handle = 0
 
-    def push(self, item: Process) -> None:
+    @property
+    def items(self) -> list:
         """
-        Pushes a process into the queue
+        The items of the queue, from the first to the last
+        """
+        return list(self.entries.values())
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def addHandle(self, process: Process, handle: int) -> None:
+        """
+        Registers the handle of a process pushed into the queue
 
         Returns:
             None
         """
-        self.items.append(item)
+        self.handles.setdefault(process, []).append(handle)
+
+    def dropHandle(self, process: Process, handle: int) -> None:
+        """
+        Unregisters the handle of a process leaving the queue
+
+        Returns:
+            None
+        """
+        handles = self.handles[process]
+        if len(handles) == 1:
+            del self.handles[process]
+        else:
+            handles.remove(handle)
+
+    def push(self, item: Process) -> int:
+        """
+        Pushes a process into the queue
+
+        Returns:
+            int: The handle of the process in the queue
+        """
+        self.back_handle += 1
+        self.entries[self.back_handle] = item
+        self.addHandle(item, self.back_handle)
+        return self.back_handle
+
+    def pushFront(self, item: Process) -> int:
+        """
+        Pushes a process into the front of the queue
+
+        Returns:
+            int: The handle of the process in the queue
+        """
+        self.front_handle -= 1
+        self.entries[self.front_handle] = item
+        self.entries.move_to_end(self.front_handle, last=False)
+        self.addHandle(item, self.front_handle)
+        return self.front_handle
 
     def pop(self) -> Process:
         """
@@ -26,17 +87,34 @@ class Queue:
         Returns:
             Process: First process in the queue
         """
-        return self.items.pop(0) if self.items else None
+        if not self.entries:
+            return None
+        handle, process = self.entries.popitem(last=False)
+        self.dropHandle(process, handle)
+        return process
+
+    def popBack(self) -> Process:
+        """
+        Pops a process from the back of the queue
+
+        Returns:
+            Process: Last process in the queue
+        """
+        if not self.entries:
+            return None
+        handle, process = self.entries.popitem(last=True)
+        self.dropHandle(process, handle)
+        return process
 
     def peak(self) -> Process:
         """
         Checks the first process in the queue
-        
+
         Returns:
             Process: The first process in the queue
         """
-        return self.items[0] if self.items else None
-    
+        return self.entries[next(iter(self.entries))] if self.entries else None
+
     def isEmpty(self) -> bool:
         """
         Checks if the queue is empty or not
@@ -44,8 +122,8 @@ class Queue:
         Returns:
             bool: True if it is empty, False if not
         """
-        return not bool(self.items)
-    
+        return not bool(self.entries)
+
     def changePeakProcess(self, process) -> None:
         """
         Changes the peak process with another process
@@ -53,10 +131,15 @@ class Queue:
         Returns:
             None
         """
-        if self.items:
-            self.items[0] = process
+        if self.entries:
+            handle = next(iter(self.entries))
+            peak = self.entries[handle]
+            if peak is not process:
+                self.dropHandle(peak, handle)
+                self.entries[handle] = process
+                self.addHandle(process, handle)
         return
-    
+
     # added this for lottery to remove a process not at the top.
     def remove(self, process) -> None:
         """
@@ -64,5 +147,50 @@ class Queue:
         Returns:
             None
         """
-        if process in self.items:
-            self.items.remove(process)
\ No newline at end of file
+        handles = self.handles.get(process)
+        if handles:
+            self.removeHandle(min(handles))
+
+    def removeHandle(self, handle: int) -> Process:
+        """
+        Removes the process with the given handle from the queue
+
+        Returns:
+            Process: The removed process
+        """
+        process = self.entries.pop(handle)
+        self.dropHandle(process, handle)
+        return process
+
+# Benchmark
+if __name__ == "__main__":
+    from timeit import timeit
+
+    class ListQueue:
+        def __init__(self) -> None:
+            self.items = []
+
+        def push(self, item) -> None:
+            self.items.append(item)
+
+        def pop(self):
+            return self.items.pop(0) if self.items else None
+
+        def remove(self, process) -> None:
+            if process in self.items:
+                self.items.remove(process)
+
+    def cycle(queue, processes) -> None:
+        for process in processes:
+            queue.push(process)
+        for process in processes[::1000]:
+            queue.remove(process)
+        while queue.pop():
+            continue
+
+    print("Ready processes\tList queue (s)\tQueue (s)")
+    for num_processes in (10**3, 10**4, 10**5):
+        processes = [Process(0, 1) for _ in range(num_processes)]
+        list_time = timeit(lambda: cycle(ListQueue(), processes), number=1)
+        queue_time = timeit(lambda: cycle(Queue(), processes), number=1)
+        print(f"{num_processes}\t\t{list_time:.4f}\t\t{queue_time:.4f}")
@@ -0,0 +1,130 @@
+"""
+Monte-Carlo replications of the schedulers on stochastic workloads
+
+Every replication gets its own random streams, spawned from one seed with NumPy's SeedSequence,
+so the replications are independent of each other, of the global random state and of the
+number of worker processes, and a seed always gives the same results.
+
+Example usage:
+>>> replicate("Lottery", {"quantum": 2, "pre-emptive": True}, {"num_processes": 100, "max_tickets": 10}, seed=1)
+    {'replications': 40, 'average_waiting_time': (310.2, 305.1, 315.3), 'average_response_time': (...)}
+"""
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist, fmean, stdev
+import numpy as np
+from process_table import ProcessTable
+from scheduler import createScheduler, processesOf
+from utils import calculateMetrics, calculatePerformance
+
+def generateWorkload(generator: np.random.Generator, num_processes: int = 8, min_arrival_time: int = 0,
+                     max_arrival_time: int = 30, min_duration: int = 3, max_duration: int = 15,
+                     max_tickets: int = None) -> ProcessTable:
+    """
+    Generates random processes with the same distribution as initializeProcessStack,
+    drawing all of them at once from a NumPy generator into a process table.
+    Every process has one ticket when max_tickets is not given, as in workload files without tickets.
+
+    Returns:
+        ProcessTable: The generated processes
+    """
+    arrival_times = generator.integers(min_arrival_time, max_arrival_time + 2, num_processes)
+    durations = generator.integers(min_duration, max_duration + 2, num_processes)
+    if max_tickets:
+        tickets = generator.integers(1, max_tickets + 2, num_processes)
+    else:
+        tickets = np.ones(num_processes, dtype=np.int64)
+    # The rows are sorted by arrival time first, so the PIDs, and names, follow the arrival order
+    order = arrival_times.argsort(kind="stable")
+    return ProcessTable(arrival_times[order], durations[order], tickets[order])
+
+def runReplication(job: tuple) -> tuple:
+    """
+    Runs one replication, in a worker process
+
+    Arguments:
+    job (tuple): The scheduler name, configurations, compact workload (None to generate one),
+                 workload parameters and seed sequence of the replication
+
+    Returns:
+        tuple: The average waiting time and average response time of the replication
+    """
+    scheduler_name, configurations, workload, workload_parameters, seed_sequence = job
+    workload_seed, scheduler_seed = seed_sequence.spawn(2)
+    if workload is None:
+        table = generateWorkload(np.random.default_rng(workload_seed), **workload_parameters)
+        processes = table.arrivals()
+        process_data = table.processData()
+    else:
+        processes = processesOf(workload)
+        process_data = workload.processData()
+    configurations = dict(configurations, generator=random.Random(int(scheduler_seed.generate_state(1)[0])))
+    trace = createScheduler(scheduler_name, processes, configurations).run()
+    return calculatePerformance(calculateMetrics(trace, process_data))
+
+def confidenceInterval(samples: list, confidence: float = 0.95) -> tuple:
+    """
+    Calculates the mean of the samples and its confidence interval, from the normal approximation
+
+    Returns:
+        tuple: The mean, the lower and the upper bound of the interval
+    """
+    mean = fmean(samples)
+    if len(samples) < 2:
+        return mean, mean, mean
+    half_width = NormalDist().inv_cdf((1 + confidence) / 2) * stdev(samples) / len(samples) ** 0.5
+    return mean, mean - half_width, mean + half_width
+
+def replicate(scheduler_name: str, configurations: dict, workload_parameters: dict = None, workload=None,
+              max_replications: int = 1000, min_replications: int = 10, batch_size: int = 16,
+              confidence: float = 0.95, tolerance: float = 0.01, seed: int = None, max_workers: int = None) -> dict:
+    """
+    Runs independent replications of a scheduler in parallel, until the confidence intervals of the
+    average waiting and response times are within tolerance of their means, or max_replications ran.
+
+    Arguments:
+    scheduler_name (str): One of FCFS, SJF, SRTF, Round-Robin, MLFQ, Lottery and Stride
+    configurations (dict): The configurations of the scheduler, as for createScheduler
+    workload_parameters (dict): The arguments of generateWorkload, to draw a new workload every replication
+    workload (Workload): A workload to use in every replication instead, as made by scheduler.workloadOf
+    batch_size (int): The number of replications run between two checks of the intervals
+    tolerance (float): The largest accepted half width of the intervals, relative to the means
+
+    Returns:
+        dict: The number of replications, and the mean, lower and upper bound of the
+        average_waiting_time and average_response_time
+    """
+    seed_sequences = iter(np.random.SeedSequence(seed).spawn(max_replications))
+    waiting_times = []
+    response_times = []
+    max_workers = max_workers or min(batch_size, os.cpu_count() or 1)
+    # Every replication only sends the name of the shared workload, not its processes
+    shared_workload = workload.share() if workload is not None else None
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while len(waiting_times) < max_replications:
+                count = min(batch_size, max_replications - len(waiting_times))
+                jobs = [(scheduler_name, configurations, shared_workload, workload_parameters or {},
+                         next(seed_sequences))
+                        for _ in range(count)]
+                for waiting_time, response_time in executor.map(runReplication, jobs):
+                    waiting_times.append(waiting_time)
+                    response_times.append(response_time)
+                if len(waiting_times) >= min_replications and all(
+                        high - low <= 2 * tolerance * abs(mean)
+                        for mean, low, high in (confidenceInterval(waiting_times, confidence),
+                                                confidenceInterval(response_times, confidence))):
+                    break
+    finally:
+        if shared_workload is not workload:
+            shared_workload.close()
+    return {"replications": len(waiting_times),
+            "average_waiting_time": confidenceInterval(waiting_times, confidence),
+            "average_response_time": confidenceInterval(response_times, confidence)}
+
+# Debug
+if __name__ == "__main__":
+    print(replicate("Lottery", {"quantum": 2, "pre-emptive": True},
+                    {"num_processes": 100, "max_tickets": 10}, seed=1, tolerance=0.02))
+    print(replicate("Round-Robin", {"quantum": 4}, {"num_processes": 100}, seed=1, tolerance=0.02))
@@ -2,25 +2,24 @@ from process import *
 from queue_ import Queue
 from stack import Stack
 from utils import *
+from engine import Scheduler
 from priority_queue import *
 
-class RoundRobin():
+class RoundRobin(Scheduler):
     counter = 0
     def __init__(self, process_stack, quantum):
+        super().__init__(process_stack)
         RoundRobin.counter += 1
         self.name = f"RoundRobin: {RoundRobin.counter}"
-        self.process_stack = process_stack
         self.queue = Queue()
         self.quantum = quantum
         self.waiting_processes = []
-        self.time_step = 0
-        self.details = {"state": [], "level": []}
     
-    def step(self):
-        if not (self.process_stack.isEmpty() and self.queue.isEmpty() and not self.waiting_processes):
+    def advance(self, limit=None):
+        if not (self.arrivals.isEmpty() and self.queue.isEmpty() and not self.waiting_processes):
 
             # Get arrived process
-            arrived_processes = getArrivedProcesses(self.process_stack, self.time_step)
+            arrived_processes = self.admitArrivals()
             for process in arrived_processes:
                 process.quantum = self.quantum
                 self.queue.push(process)
@@ -32,9 +31,13 @@ class RoundRobin():
 
             current_process = self.queue.peak()
             if current_process:
-                current_process.decrementDuration()
-                self.details["state"].append(current_process.name)
-                self.details["level"].append(0)
+                # Arrivals join the back of the queue, so only the quantum expiry or the completion ends the run
+                length = self.spanLength(limit, current_process.duration, current_process.quantum or 1)
+                for process in self.admitArrivals(length):
+                    process.quantum = self.quantum
+                    self.queue.push(process)
+                current_process.decrementDuration(length)
+                self.record(current_process.name, 0, length)
                 if current_process.duration:
                     if current_process.quantum:
                         self.queue.changePeakProcess(current_process)
@@ -44,17 +47,10 @@ class RoundRobin():
                 else:
                     self.queue.pop()
             else:
-                self.details["state"].append("idle")
-                self.details["level"].append(0)
-            self.time_step += 1
+                self.record("idle", 0, self.spanLength(limit, self.untilNextArrival()))
             return True
         return False
 
-    def run(self):
-        while(self.step()):
-            continue
-        return self.details
-
 if __name__ == "__main__":
     stack = Stack()
     stack.push(Process(0, 3))
@@ -0,0 +1,375 @@
+"""
+Headless runner of the schedulers
+
+Example usage:
+    python -m scheduler run --policy rr --quantum 4 --workload workload.csv --metrics metrics.csv --trace trace.csv
+    python -m scheduler run --resume run.checkpoint --checkpoint run.checkpoint --trace run.trace
+    python -m scheduler sweep --policy mlfq --quanta "2,5,100000;4,8,100000" --boost-time 50,100 --workload workload.csv
+    python -m scheduler replicate --policy lottery --max-tickets 10 --processes 100 --tolerance 0.01 --seed 1
+
+The workload is a CSV, JSON Lines or Parquet file with an arrival_time and a duration column,
+and optionally name, tickets, priority and depends_on columns, sorted by arrival time.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from arrivals import ArrivalQueue, ArrivalStream
+from engine import Scheduler
+from fcfs import FCFS
+from lottery import Lottery, Stride
+from mlfq import MLFQ
+from queue_ import Queue
+from rr import RoundRobin
+from sjf import SJF
+from srtf import SRTF
+from trace_file import TraceWriter
+from utils import calculateMetrics, calculatePerformance
+from workload import Workload, streamProcesses
+
+POLICIES = {
+    "fcfs": "FCFS",
+    "sjf": "SJF",
+    "srtf": "SRTF",
+    "rr": "Round-Robin",
+    "mlfq": "MLFQ",
+    "lottery": "Lottery",
+    "stride": "Stride",
+}
+
+METRIC_COLUMNS = ["process", "arrival_time", "first_run", "completion_time", "burst_time",
+                  "waiting_time", "response_time", "turnaround_time"]
+
+def createScheduler(scheduler_name: str, processes, configurations: dict):
+    """
+    Builds a scheduler from its name, as shown in the application, and its configurations
+
+    Arguments:
+    scheduler_name (str): One of FCFS, SJF, SRTF, Round-Robin, MLFQ, Lottery and Stride
+    processes (Stack/ArrivalQueue): The processes to schedule
+    configurations (dict): The quantum, pre-emptive, boost_time, quanta and structure of the scheduler, when needed,
+                           and optionally the random.Random generator and batched draws of Lottery
+
+    Example usage:
+    >>> createScheduler("Round-Robin", stack, {"quantum": 4})
+        RoundRobin
+
+    Returns:
+        Scheduler: The scheduler of the processes
+    """
+    if scheduler_name == "MLFQ":
+        return MLFQ(process_stack=processes,
+                    boost_time=configurations["boost_time"],
+                    pre_emptive=configurations["pre-emptive"],
+                    quanta=configurations["quanta"],
+                    structure=configurations["structure"])
+    if scheduler_name == "SJF":
+        return SJF(process_stack=processes)
+    if scheduler_name == "FCFS":
+        return FCFS(process_stack=processes)
+    if scheduler_name == "SRTF":
+        return SRTF(process_stack=processes)
+    if scheduler_name == "Round-Robin":
+        return RoundRobin(process_stack=processes, quantum=configurations["quantum"])
+    if scheduler_name == "Lottery":
+        return Lottery(process_stack=processes, quantum=configurations["quantum"],
+                       pre_emptive=configurations["pre-emptive"], batched=configurations.get("batched", False),
+                       generator=configurations.get("generator"))
+    if scheduler_name == "Stride":
+        return Stride(process_stack=processes, quantum=configurations["quantum"])
+    raise ValueError(f"Unknown scheduler: {scheduler_name}")
+
+def loadWorkload(path: str) -> ArrivalStream:
+    """
+    Opens a workload file, its processes are read as the scheduler gets to their arrival times
+
+    Arguments:
+    path (str): Path of a CSV, JSON Lines or Parquet file sorted by arrival time, as described in workload.py
+
+    Returns:
+        ArrivalStream: The processes of the workload
+    """
+    return ArrivalStream(streamProcesses(path))
+
+def workloadOf(processes) -> Workload:
+    """
+    Gets an immutable copy of a workload, shared by all the runs on it and cheap to send to worker processes
+
+    Arguments:
+    processes (Stack/ArrivalQueue): The processes of the workload
+
+    Returns:
+        Workload: The arrival time, duration, tickets and name of every process
+    """
+    # A stack releases the processes arriving together in the reverse of their push order
+    return Workload.fromProcesses(ArrivalQueue.of(processes).items)
+
+def processesOf(workload: Workload) -> ArrivalStream:
+    """
+    Starts a new run of a workload, its processes are views of the workload with their own remaining time
+
+    Returns:
+        ArrivalStream: The processes of the run
+    """
+    return workload.arrivals()
+
+def runJob(job: tuple) -> tuple:
+    """
+    Runs a scheduler on a compact workload, in a worker process
+
+    Arguments:
+    job (tuple): The label, scheduler name, configurations and compact workload of the run
+
+    Returns:
+        tuple: The label, average waiting time and average response time of the run
+    """
+    label, scheduler_name, configurations, workload = job
+    process_data = workload.processData()
+    trace = createScheduler(scheduler_name, processesOf(workload), configurations).run()
+    average_waiting_time, average_response_time = calculatePerformance(calculateMetrics(trace, process_data))
+    return label, average_waiting_time, average_response_time
+
+def compareSchedulers(jobs: list, max_workers: int = None):
+    """
+    Runs the jobs in parallel on a process pool, yielding the results as soon as each one finishes
+
+    Example usage:
+    >>> for index, (label, waiting, response) in compareSchedulers(jobs):
+            print(label, waiting, response)
+
+    Returns:
+        Generator(tuple): The index of the job and its result, in the order they finish
+    """
+    max_workers = max_workers or min(len(jobs), os.cpu_count() or 1) or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(runJob, job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def writeMetrics(path: str, results: dict) -> None:
+    """
+    Writes the metrics of every process to a CSV file
+
+    Returns:
+        None
+    """
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(METRIC_COLUMNS)
+        for name, metrics in results.items():
+            writer.writerow([name] + metrics)
+
+def writeTrace(path: str, trace) -> None:
+    """
+    Writes the segments of a trace to a CSV file
+
+    Returns:
+        None
+    """
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["state", "level", "start", "length"])
+        writer.writerows(trace.segments())
+
+def writeCheckpoint(path: str, scheduler) -> None:
+    """
+    Writes a snapshot of a scheduler to a file, replacing the previous one only once it is complete
+
+    Returns:
+        None
+    """
+    with open(path + ".tmp", "wb") as file:
+        file.write(scheduler.snapshot())
+    os.replace(path + ".tmp", path)
+
+def configurationsOf(args) -> dict:
+    """
+    Gets the scheduler configurations out of the command-line arguments
+
+    Returns:
+        dict: The configurations of the scheduler
+    """
+    quanta = [int(quantum) for quantum in args.quanta.split(",")]
+    return {"quantum": args.quantum,
+            "pre-emptive": args.pre_emptive,
+            "batched": args.batched,
+            "boost_time": args.boost_time,
+            "quanta": quanta,
+            "structure": [Queue() for _ in quanta]}
+
+def run(args) -> None:
+    """
+    Runs a scheduler on a workload and writes its results
+
+    Returns:
+        None
+    """
+    if args.resume:
+        # The checkpoint holds the scheduler with its random state and trace, ready to go on
+        with open(args.resume, "rb") as file:
+            scheduler = Scheduler.resume(file.read())
+        binary_trace = isinstance(scheduler.trace, TraceWriter)
+        # The policy is the one of the checkpoint, whatever --policy says
+        policy = next(policy for policy, name in POLICIES.items()
+                      if name.replace("-", "") == type(scheduler).__name__)
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+        # The metrics are kept by the scheduler while it runs, so the workload is read as it goes
+        policy = args.policy
+        scheduler = createScheduler(POLICIES[policy], loadWorkload(args.workload), configurationsOf(args))
+        binary_trace = args.trace and args.trace.endswith(".trace")
+        if binary_trace:
+            # The segments are written to the trace file while the scheduler runs
+            scheduler.trace = TraceWriter(args.trace)
+    next_checkpoint = scheduler.time_step + args.checkpoint_interval
+    while scheduler.jump():
+        if args.checkpoint and scheduler.time_step >= next_checkpoint:
+            writeCheckpoint(args.checkpoint, scheduler)
+            next_checkpoint = scheduler.time_step + args.checkpoint_interval
+    trace = scheduler.trace
+    metrics = sorted(((name, process) for name, process in scheduler.metrics().items() if process["first_run"] is not None),
+                     key=lambda item: item[1]["first_run"])
+    results = {name: [process[column] for column in METRIC_COLUMNS[1:]] for name, process in metrics}
+    if binary_trace:
+        trace.close({name: [process["arrival_time"], process["burst_time"]]
+                     for name, process in scheduler.metrics().items()})
+    average_waiting_time, average_response_time = calculatePerformance(results)
+    if args.metrics:
+        writeMetrics(args.metrics, results)
+    if args.trace and not binary_trace:
+        writeTrace(args.trace, trace)
+    print(f"policy: {policy}")
+    print(f"processes: {len(results)}")
+    print(f"makespan: {len(trace)}")
+    print(f"average waiting time: {average_waiting_time:.4f}")
+    print(f"average response time: {average_response_time:.4f}")
+
+def runSweep(args) -> None:
+    """
+    Sweeps the configurations of a scheduler on a workload and writes the table of results
+
+    Returns:
+        None
+    """
+    from sweep import grid, latinHypercube, randomSample, sweep
+
+    axes = {}
+    if args.quantum:
+        axes["quantum"] = [int(quantum) for quantum in args.quantum.split(",")]
+    if args.quanta:
+        axes["quanta"] = [tuple(int(quantum) for quantum in quanta.split(",")) for quanta in args.quanta.split(";")]
+    if args.boost_time:
+        axes["boost_time"] = [int(boost_time) for boost_time in args.boost_time.split(",")]
+    if args.batched:
+        axes["batched"] = [True]
+    if args.sample == "grid":
+        configurations = grid(**axes)
+    elif args.sample == "random":
+        configurations = randomSample(args.samples, args.seed, **axes)
+    else:
+        configurations = latinHypercube(args.samples, args.seed, **axes)
+    table = sweep(POLICIES[args.policy], configurations, workloadOf(loadWorkload(args.workload)), args.workers,
+                  args.seed)
+    if args.output:
+        table.to_csv(args.output, index=False)
+    print(table.to_string(index=False))
+
+def runReplications(args) -> None:
+    """
+    Replicates a scheduler on random workloads, or on a workload file with random draws,
+    and prints the means and confidence intervals
+
+    Returns:
+        None
+    """
+    from replicate import replicate
+
+    workload = workloadOf(loadWorkload(args.workload)) if args.workload else None
+    workload_parameters = {"num_processes": args.processes, "max_arrival_time": args.max_arrival_time,
+                           "max_tickets": args.max_tickets}
+    results = replicate(POLICIES[args.policy], configurationsOf(args), workload_parameters, workload,
+                        max_replications=args.replications, min_replications=args.min_replications,
+                        confidence=args.confidence, tolerance=args.tolerance, seed=args.seed, max_workers=args.workers)
+    print(f"policy: {args.policy}")
+    print(f"replications: {results['replications']}")
+    for metric in ("average_waiting_time", "average_response_time"):
+        mean, low, high = results[metric]
+        print(f"{metric.replace('_', ' ')}: {mean:.4f} [{low:.4f}, {high:.4f}]")
+
+def parseArguments(argv: list = None):
+    parser = argparse.ArgumentParser(prog="scheduler", description="Run process scheduler simulations without the interface")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run a scheduler on a workload")
+    run_parser.add_argument("--policy", choices=POLICIES, help="Scheduling policy, not needed with --resume")
+    source = run_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--workload", help="CSV, JSON Lines or Parquet workload file")
+    source.add_argument("--resume", help="Checkpoint file to resume a run from, instead of a workload")
+    run_parser.add_argument("--quantum", type=int, default=2, help="Quantum of Round-Robin, Lottery and Stride")
+    run_parser.add_argument("--quanta", default="2,5,100000", help="Comma separated quanta of the MLFQ levels")
+    run_parser.add_argument("--boost-time", type=int, default=10000, help="Boost time of MLFQ")
+    run_parser.add_argument("--non-pre-emptive", dest="pre_emptive", action="store_false",
+                            help="Run MLFQ and Lottery without pre-emption")
+    run_parser.add_argument("--batched", action="store_true",
+                            help="Draw the Lottery winners from an alias table, rebuilt when processes arrive")
+    run_parser.add_argument("--seed", type=int, help="Seed of the lottery draws")
+    run_parser.add_argument("--metrics", help="CSV file to write the metrics of every process to")
+    run_parser.add_argument("--trace", help="CSV file to write the trace segments to, or a binary .trace file")
+    run_parser.add_argument("--checkpoint", help="File to save a snapshot of the run to, to resume it if interrupted")
+    run_parser.add_argument("--checkpoint-interval", type=int, default=100000,
+                            help="Time steps between two snapshots of the run")
+    run_parser.set_defaults(function=run)
+
+    sweep_parser = commands.add_parser("sweep", help="Run a scheduler with many configurations on a workload")
+    sweep_parser.add_argument("--policy", choices=POLICIES, required=True)
+    sweep_parser.add_argument("--workload", required=True, help="CSV, JSON Lines or Parquet workload file")
+    sweep_parser.add_argument("--quantum", help="Comma separated quanta of Round-Robin, Lottery and Stride")
+    sweep_parser.add_argument("--quanta", help="Semicolon separated MLFQ structures, each one comma separated quanta")
+    sweep_parser.add_argument("--boost-time", help="Comma separated boost times of MLFQ")
+    sweep_parser.add_argument("--batched", action="store_true",
+                              help="Draw the Lottery winners from an alias table, rebuilt when processes arrive")
+    sweep_parser.add_argument("--sample", choices=["grid", "random", "lhs"], default="grid",
+                              help="Run every combination, or a random or Latin hypercube sample of them")
+    sweep_parser.add_argument("--samples", type=int, default=16, help="Number of configurations to sample")
+    sweep_parser.add_argument("--seed", type=int, help="Seed of the sampling and of the lottery draws")
+    sweep_parser.add_argument("--workers", type=int, help="Number of worker processes, all the cores by default")
+    sweep_parser.add_argument("--output", help="CSV file to write the table of results to")
+    sweep_parser.set_defaults(function=runSweep)
+
+    replicate_parser = commands.add_parser("replicate", help="Run independent random replications of a scheduler")
+    replicate_parser.add_argument("--policy", choices=POLICIES, required=True)
+    replicate_parser.add_argument("--workload", help="Workload file to use in every replication, a random one by default")
+    replicate_parser.add_argument("--processes", type=int, default=100, help="Number of processes of the random workloads")
+    replicate_parser.add_argument("--max-arrival-time", type=int, default=30, help="Latest arrival time of the random workloads")
+    replicate_parser.add_argument("--max-tickets", type=int,
+                                  help="Most tickets of a process of the random workloads, one ticket each by default")
+    replicate_parser.add_argument("--quantum", type=int, default=2, help="Quantum of Round-Robin, Lottery and Stride")
+    replicate_parser.add_argument("--quanta", default="2,5,100000", help="Comma separated quanta of the MLFQ levels")
+    replicate_parser.add_argument("--boost-time", type=int, default=10000, help="Boost time of MLFQ")
+    replicate_parser.add_argument("--non-pre-emptive", dest="pre_emptive", action="store_false",
+                                  help="Run MLFQ and Lottery without pre-emption")
+    replicate_parser.add_argument("--batched", action="store_true",
+                                  help="Draw the Lottery winners from an alias table, rebuilt when processes arrive")
+    replicate_parser.add_argument("--replications", type=int, default=1000, help="Most replications to run")
+    replicate_parser.add_argument("--min-replications", type=int, default=10, help="Fewest replications to run")
+    replicate_parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the intervals")
+    replicate_parser.add_argument("--tolerance", type=float, default=0.01,
+                                  help="Stop once the half width of the intervals is within this fraction of the means")
+    replicate_parser.add_argument("--seed", type=int, help="Seed of all the replications")
+    replicate_parser.add_argument("--workers", type=int, help="Number of worker processes, all the cores by default")
+    replicate_parser.set_defaults(function=runReplications)
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.workload and not args.policy:
+        run_parser.error("--policy is required with --workload")
+    return args
+
+def main(argv: list = None) -> int:
+    args = parseArguments(argv)
+    args.function(args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
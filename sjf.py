@@ -2,57 +2,51 @@ from process import *
 from queue_ import Queue
 from stack import Stack
 from utils import *
+from engine import Scheduler
 from priority_queue import *
 
-class SJF():
+class SJF(Scheduler):
     counter = 0
     def __init__(self, process_stack):
+        super().__init__(process_stack)
         SJF.counter += 1
         self.name = f"SJF: {SJF.counter}"
-        self.process_stack = process_stack
-        self.queue = PriorityQueue()
+        self.queue = IndexedPriorityQueue()
         self.waiting_processes = []
-        self.time_step = 0
-        self.details = {"state": [], "level": []}
 
-    def step(self):
-        if not (self.process_stack.isEmpty() and self.queue.isEmpty() and not self.waiting_processes):
+    def advance(self, limit=None):
+        if not (self.arrivals.isEmpty() and self.queue.isEmpty() and not self.waiting_processes):
             # Get arrived process
-            arrived_processes = getArrivedProcesses(self.process_stack, self.time_step)
+            arrived_processes = self.admitArrivals()
             for process in arrived_processes:
                 self.waiting_processes.append(process)
             
             if self.time_step == 0:
-                for process in self.waiting_processes:
-                        self.queue.push(process)
+                self.queue.pushAll(self.waiting_processes)
                 self.waiting_processes = []
             
-            process = self.queue.pop()
+            process = self.queue.peak()
             if process:
-                self.details["state"].append(process.name)
-                self.details["level"].append(0)
-                process.decrementDuration()
+                # Arrivals wait until the running process finishes, so only the completion ends the run
+                length = self.spanLength(limit, process.duration)
+                self.waiting_processes.extend(self.admitArrivals(length))
+                self.record(process.name, 0, length)
+                process.decrementDuration(length)
                 if process.duration:
-                    self.queue.push(process)
+                    self.queue.updatePeak()
                 else:
-                    for process in self.waiting_processes:
-                        self.queue.push(process)
+                    self.queue.pop()
+                    self.queue.pushAll(self.waiting_processes)
                     self.waiting_processes = []
-            else:
-                self.details["state"].append("idle")
-                self.details["level"].append(0)
-                for process in self.waiting_processes:
-                    self.queue.push(process)
+            elif self.waiting_processes:
+                self.record("idle", 0, 1)
+                self.queue.pushAll(self.waiting_processes)
                 self.waiting_processes = []
-            self.time_step += 1
+            else:
+                self.record("idle", 0, self.spanLength(limit, self.untilNextArrival()))
             return True
         return False
 
-    def run(self):
-        while(self.step()):
-            continue
-        return self.details
-
 
 if __name__ == "__main__":
     stack = Stack()
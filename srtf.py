@@ -2,46 +2,40 @@ from process import *
 from queue_ import Queue
 from stack import Stack
 from utils import *
+from engine import Scheduler
 from priority_queue import *
 
-class SRTF():
+class SRTF(Scheduler):
     counter = 0
     def __init__(self, process_stack):
+        super().__init__(process_stack)
         SRTF.counter += 1
         self.name = f"SRTF: {SRTF.counter}"
-        self.process_stack = process_stack
-        self.queue = PriorityQueue()
+        self.queue = IndexedPriorityQueue()
         self.waiting_processes = []
-        self.time_step = 0
-        self.details = {"state": [], "level": []}
 
-    def step(self):
-        if not (self.process_stack.isEmpty() and self.queue.isEmpty() and not self.waiting_processes):
+    def advance(self, limit=None):
+        if not (self.arrivals.isEmpty() and self.queue.isEmpty() and not self.waiting_processes):
 
             # Get arrived process
-            arrived_processes = getArrivedProcesses(self.process_stack, self.time_step)
-            for process in arrived_processes:
-                self.queue.push(process)
+            arrived_processes = self.admitArrivals()
+            self.queue.pushAll(arrived_processes)
             
-            process = self.queue.pop()
+            process = self.queue.peak()
             if process:
-                self.details["state"].append(process.name)
-                self.details["level"].append(0)
-                process.decrementDuration()
+                # Only an arrival can preempt the shortest process before it finishes
+                length = self.spanLength(limit, process.duration, self.untilNextArrival())
+                self.record(process.name, 0, length)
+                process.decrementDuration(length)
                 if process.duration:
-                    self.queue.push(process)
+                    self.queue.updatePeak()
+                else:
+                    self.queue.pop()
             else:
-                self.details["state"].append("idle")
-                self.details["level"].append(0)
-            self.time_step += 1
+                self.record("idle", 0, self.spanLength(limit, self.untilNextArrival()))
             return True
         return False
 
-    def run(self):
-        while(self.step()):
-            continue
-        return self.details
-
 if __name__ == "__main__":
     stack = Stack()
     stack.push(Process(0, 10))
@@ -0,0 +1,128 @@
+"""
+Parameter sweeps of the scheduler configurations
+
+Example usage:
+>>> configurations = grid(quanta=[(2, 5, 100000), (4, 8, 100000)], boost_time=[50, 100, 10000])
+>>> table = sweep("MLFQ", configurations, workloadOf(stack))
+"""
+import itertools
+import os
+import random
+from pool import SimulationPool
+
+# The configurations each scheduler depends on, the others are dropped before running
+PARAMETERS = {
+    "FCFS": (),
+    "SJF": (),
+    "SRTF": (),
+    "Round-Robin": ("quantum",),
+    "Lottery": ("quantum", "pre-emptive", "batched"),
+    "Stride": ("quantum",),
+    "MLFQ": ("quanta", "boost_time", "pre-emptive"),
+}
+
+DEFAULTS = {"quantum": 2, "pre-emptive": True, "batched": False, "boost_time": 10000, "quanta": (2, 5, 100000)}
+
+def grid(**axes) -> list:
+    """
+    Makes every combination of the values of each configuration
+
+    Example usage:
+    >>> grid(quantum=[1, 2], boost_time=[10, 20])
+        [{'quantum': 1, 'boost_time': 10}, {'quantum': 1, 'boost_time': 20}, {'quantum': 2, 'boost_time': 10}, {'quantum': 2, 'boost_time': 20}]
+
+    Returns:
+        list(dict): The configurations
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+def randomSample(num_samples: int, seed: int = None, **axes) -> list:
+    """
+    Draws configurations at random, each axis is either a list of values to choose from
+    or a (low, high) range of integers, both ends included
+
+    Example usage:
+    >>> randomSample(3, seed=1, quantum=(1, 16), pre_emptive=[True, False])
+
+    Returns:
+        list(dict): The configurations
+    """
+    generator = random.Random(seed)
+    return [{name: generator.randint(*axis) if isinstance(axis, tuple) else generator.choice(axis)
+             for name, axis in axes.items()}
+            for _ in range(num_samples)]
+
+def latinHypercube(num_samples: int, seed: int = None, **axes) -> list:
+    """
+    Draws configurations from a Latin hypercube: every axis is split into num_samples strata and
+    each stratum is used exactly once, so the samples cover every axis evenly.
+    Each axis is either a list of values or a (low, high) range of integers, both ends included.
+
+    Returns:
+        list(dict): The configurations
+    """
+    generator = random.Random(seed)
+    columns = {}
+    for name, axis in axes.items():
+        values = list(range(axis[0], axis[1] + 1)) if isinstance(axis, tuple) else list(axis)
+        strata = list(range(num_samples))
+        generator.shuffle(strata)
+        columns[name] = [values[int((stratum + generator.random()) * len(values) / num_samples)] for stratum in strata]
+    return [{name: columns[name][i] for name in axes} for i in range(num_samples)]
+
+def normalize(scheduler_name: str, configuration: dict) -> tuple:
+    """
+    Keeps only the configurations the scheduler depends on, filling in the defaults, in a hashable form
+
+    Returns:
+        tuple: The (name, value) pairs of the configuration
+    """
+    # pre-emptive can not be a keyword argument of grid and the samplers
+    configuration = {"pre-emptive" if name == "pre_emptive" else name: value for name, value in configuration.items()}
+    return tuple((name, tuple(value) if isinstance(value, list) else value)
+                 for name, value in ((name, configuration.get(name, DEFAULTS[name]))
+                                     for name in PARAMETERS[scheduler_name]))
+
+def sweep(scheduler_name: str, configurations: list, workload, max_workers: int = None, seed: int = None):
+    """
+    Runs a scheduler with every configuration on a workload, over all the cores.
+    Configurations that are the same for the scheduler are only run once.
+
+    Arguments:
+    scheduler_name (str): One of FCFS, SJF, SRTF, Round-Robin, MLFQ, Lottery and Stride
+    configurations (list): The configurations to run, as made by grid, randomSample or latinHypercube
+    workload (Workload): The workload, as made by scheduler.workloadOf
+    seed (int): The seed of the lottery draws, every configuration gets its own stream spawned from it
+
+    Returns:
+        pd.DataFrame: One row per configuration, with its parameters and the
+        average_waiting_time, average_response_time and average_turnaround_time
+    """
+    import numpy as np
+    import pandas as pd
+
+    jobs = list(dict.fromkeys(normalize(scheduler_name, configuration) for configuration in configurations))
+    # The draws of a configuration only depend on the seed and its index, not on the worker running it
+    simulations = [(scheduler_name, dict(job)) for job in jobs]
+    if scheduler_name == "Lottery":
+        for (name, configuration), seed_sequence in zip(simulations, np.random.SeedSequence(seed).spawn(len(jobs))):
+            configuration["generator"] = random.Random(int(seed_sequence.generate_state(1)[0]))
+    max_workers = max_workers or min(len(jobs), os.cpu_count() or 1) or 1
+    with SimulationPool(workload, max_workers) as pool:
+        results = pool.map(simulations)
+    rows = [dict(job, policy=scheduler_name, average_waiting_time=waiting,
+                 average_response_time=response, average_turnaround_time=turnaround)
+            for job, (waiting, response, turnaround, cpu_utilization) in zip(jobs, results)]
+    return pd.DataFrame(rows, columns=["policy", *PARAMETERS[scheduler_name], "average_waiting_time",
+                                       "average_response_time", "average_turnaround_time"])
+
+# Debug
+if __name__ == "__main__":
+    from scheduler import workloadOf
+    from utils import initializeProcessStack
+
+    workload = workloadOf(initializeProcessStack(num_processes=100))
+    print(sweep("Round-Robin", grid(quantum=[1, 2, 4, 8, 16]), workload))
+    print(sweep("MLFQ", latinHypercube(8, seed=1, boost_time=(10, 200),
+                                       quanta=[(1, 2, 100000), (2, 5, 100000), (4, 8, 100000)]), workload))
@@ -0,0 +1,163 @@
+from process import Process
+from queue_ import Queue
+
+class TicketIndex:
+    """
+    Implementation of a ticket index as a binary indexed (Fenwick) tree keyed by slot
+
+    Attributes:
+        capacity (int): The number of slots of the index
+        tree (list): The Fenwick tree of the ticket counts, 1-indexed
+        tickets (list): The ticket count of each slot
+        total (int): The sum of the tickets of all the slots
+    """
+    def __init__(self, capacity: int = 16) -> None:
+        self.capacity = capacity
+        self.tree = [0] * (capacity + 1)
+        self.tickets = [0] * capacity
+        self.total = 0
+        self.top_step = 1 << (capacity.bit_length() - 1) if capacity else 0
+
+    @classmethod
+    def build(cls, tickets: list, capacity: int):
+        """
+        Builds an index from the ticket counts of the first slots in O(n)
+
+        Returns:
+            TicketIndex: The built index
+        """
+        index = cls(capacity)
+        index.tickets[:len(tickets)] = tickets
+        index.tree[1:len(tickets) + 1] = tickets
+        for i in range(1, capacity + 1):
+            parent = i + (i & -i)
+            if parent <= capacity:
+                index.tree[parent] += index.tree[i]
+        index.total = sum(tickets)
+        return index
+
+    def set(self, slot: int, tickets: int) -> None:
+        """
+        Sets the ticket count of a slot, a count of 0 frees the slot
+
+        Returns:
+            None
+        """
+        delta = tickets - self.tickets[slot]
+        if not delta:
+            return
+        self.tickets[slot] = tickets
+        self.total += delta
+        i = slot + 1
+        while i <= self.capacity:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, ticket: int) -> int:
+        """
+        Finds the slot holding a ticket, meaning the first slot whose prefix sum of tickets exceeds it
+
+        Returns:
+            int: The slot holding the ticket
+        """
+        position = 0
+        step = self.top_step
+        while step:
+            next_position = position + step
+            if next_position <= self.capacity and self.tree[next_position] <= ticket:
+                position = next_position
+                ticket -= self.tree[next_position]
+            step >>= 1
+        return position
+
+
+class TicketQueue(Queue):
+    """
+    Implementation of a queue that keeps a ticket index of its processes
+
+    The processes pushed to the back take the next slot of the index, so the slots are in
+    queue order and drawing a ticket picks the same process as scanning the queue from the front,
+    in O(log n) instead of O(n). When the slots run out the index is compacted.
+
+    Attributes:
+        index (TicketIndex): The ticket index of the queue
+        slots (dict): The slot of each handle in the queue
+        slot_handles (list): The handle of each used slot, None if the slot was freed
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.index = TicketIndex()
+        self.slots = {}
+        self.slot_handles = []
+        self.last_handle = 0
+
+    def addHandle(self, process: Process, handle: int) -> None:
+        """
+        Registers the handle of a process pushed into the queue and gives it a slot
+
+        Returns:
+            None
+        """
+        super().addHandle(process, handle)
+        if handle > self.last_handle and len(self.slot_handles) < self.index.capacity:
+            self.last_handle = handle
+            self.slots[handle] = len(self.slot_handles)
+            self.slot_handles.append(handle)
+            self.index.set(self.slots[handle], process.tickets)
+        else:
+            self.rebuild()
+
+    def dropHandle(self, process: Process, handle: int) -> None:
+        """
+        Unregisters the handle of a process leaving the queue and frees its slot
+
+        Returns:
+            None
+        """
+        super().dropHandle(process, handle)
+        slot = self.slots.pop(handle, None)
+        if slot is not None:
+            self.index.set(slot, 0)
+            self.slot_handles[slot] = None
+
+    def rebuild(self) -> None:
+        """
+        Gives the processes consecutive slots in queue order and rebuilds the index
+
+        Returns:
+            None
+        """
+        handles = list(self.entries)
+        self.slots = {handle: slot for slot, handle in enumerate(handles)}
+        self.slot_handles = handles
+        self.last_handle = self.back_handle
+        self.index = TicketIndex.build([process.tickets for process in self.entries.values()],
+                                       max(2 * len(handles), 16))
+
+    def updateTickets(self, process: Process) -> None:
+        """
+        Updates the index after the tickets of a process in the queue changed
+
+        Returns:
+            None
+        """
+        for handle in self.handles.get(process, []):
+            self.index.set(self.slots[handle], process.tickets)
+
+    def totalTickets(self) -> int:
+        """
+        Sums the tickets of all the processes in the queue
+
+        Returns:
+            int: The total number of tickets
+        """
+        return self.index.total
+
+    def draw(self, ticket: int) -> Process:
+        """
+        Finds the process holding a ticket, counting the tickets from the front of the queue
+
+        Returns:
+            Process: The process holding the ticket
+        """
+        return self.entries[self.slot_handles[self.index.find(ticket)]]
@@ -0,0 +1,150 @@
+from array import array
+from bisect import bisect_right
+
+class Trace:
+    """
+    Run-length encoded schedule of the CPU. Every segment holds the state the CPU was in
+    (a process name or 'idle'), its level, when it started and for how long it lasted,
+    so the memory used depends on the number of context switches, not on the total time.
+
+    Attributes:
+        names (list): The states appearing in the trace, indexed by their state id
+        ids (array): The state id of each segment
+        levels (array): The level of each segment
+        starts (array): The start time of each segment
+        lengths (array): The length of each segment
+        duration (int): The total time covered by the trace
+    """
+    def __init__(self) -> None:
+        self.names = []
+        self.name_ids = {}
+        self.ids = array('l')
+        self.levels = array('l')
+        self.starts = array('q')
+        self.lengths = array('q')
+        self.duration = 0
+
+    def stateId(self, state: str) -> int:
+        """
+        Gets the id of a state, registering it if it is the first time it appears
+
+        Returns:
+            int: The id of the state
+        """
+        state_id = self.name_ids.get(state)
+        if state_id is None:
+            state_id = len(self.names)
+            self.name_ids[state] = state_id
+            self.names.append(state)
+        return state_id
+
+    def append(self, state: str, level: int, length: int = 1) -> None:
+        """
+        Appends length time steps of the given state and level to the end of the trace,
+        extending the last segment if it has the same state and level
+
+        Returns:
+            None
+        """
+        state_id = self.stateId(state)
+        if self.ids and self.ids[-1] == state_id and self.levels[-1] == level:
+            self.lengths[-1] += length
+        else:
+            self.ids.append(state_id)
+            self.levels.append(level)
+            self.starts.append(self.duration)
+            self.lengths.append(length)
+        self.duration += length
+
+    def segments(self, end: int = None, start: int = 0):
+        """
+        Iterates over the segments of the trace, or over its time steps from start to end,
+        the first end time steps being how the trace looked after end steps
+
+        Returns:
+            Iterator(tuple): (state, level, start, length) of each segment
+        """
+        names = self.names
+        if start <= 0 and (end is None or end >= self.duration):
+            for state_id, level, segment_start, length in zip(self.ids, self.levels, self.starts, self.lengths):
+                yield names[state_id], level, segment_start, length
+            return
+        start = max(start, 0)
+        end = self.duration if end is None else min(end, self.duration)
+        if start >= end:
+            return
+        for index in range(bisect_right(self.starts, start) - 1, bisect_right(self.starts, end - 1)):
+            segment_start = max(self.starts[index], start)
+            segment_end = min(self.starts[index] + self.lengths[index], end)
+            yield names[self.ids[index]], self.levels[index], segment_start, segment_end - segment_start
+
+    def segmentAt(self, time_step: int) -> int:
+        """
+        Finds the segment covering a time step
+
+        Returns:
+            int: Index of the segment
+        """
+        if not 0 <= time_step < self.duration:
+            raise IndexError("time step out of the trace")
+        return bisect_right(self.starts, time_step) - 1
+
+    def stateAt(self, time_step: int) -> str:
+        """
+        Checks the state of the CPU at a time step
+
+        Returns:
+            str: The process name or 'idle'
+        """
+        return self.names[self.ids[self.segmentAt(time_step)]]
+
+    def levelAt(self, time_step: int) -> int:
+        """
+        Checks the level of the CPU at a time step
+
+        Returns:
+            int: The level
+        """
+        return self.levels[self.segmentAt(time_step)]
+
+    def maxLevel(self) -> int:
+        """
+        Checks the lowest level the CPU ran at
+
+        Returns:
+            int: The largest level of the trace, 0 if it is empty
+        """
+        return max(self.levels, default=0)
+
+    def toDict(self) -> dict:
+        """
+        Expands the trace into the legacy per time step dictionary
+
+        Example usage:
+        >>> trace.toDict()
+            {'state': ['idle', 'P1', 'P1'], 'level': [0, 0, 0]}
+
+        Returns:
+            dict(str, list): The state and level at every time step
+        """
+        details = {"state": [], "level": []}
+        for state, level, start, length in self.segments():
+            details["state"].extend([state] * length)
+            details["level"].extend([level] * length)
+        return details
+
+    @classmethod
+    def fromDict(cls, details: dict):
+        """
+        Builds a trace from the legacy per time step dictionary
+
+        Returns:
+            Trace: The run-length encoded trace
+        """
+        trace = cls()
+        for state, level in zip(details["state"], details["level"]):
+            trace.append(state, level)
+        return trace
+
+    def __len__(self) -> int:
+        return self.duration
@@ -0,0 +1,307 @@
+"""
+Binary trace files
+
+A trace file starts with a fixed header, followed by one fixed-width record per segment
+(state id, level, start and length, little endian) and ends with the process table: the name,
+arrival time and burst time of every state id, as JSON. The header points to the process table,
+which is written last because the processes of a streamed workload are only all known at the end.
+
+The records are written as the scheduler runs, so the trace never has to be held in memory, and
+they are read back with numpy.memmap, so metrics, Gantt charts and the interface replay a trace
+of any size while only reading the parts of the file they use.
+
+Example usage:
+>>> scheduler.trace = TraceWriter("run.trace")
+>>> scheduler.run().close(process_data)
+>>> trace = MappedTrace("run.trace")
+>>> calculateMetrics(trace, trace.process_data)
+"""
+import json
+import os
+import struct
+from arrivals import ArrivalQueue
+from trace_ import Trace
+
+MAGIC = b"PSTRACE\0"
+VERSION = 1
+# Magic, version, record size, segment count, duration, process table offset and length
+HEADER = struct.Struct("<8sIIqqqq")
+# State id, level, start and length of a segment
+RECORD = struct.Struct("<iiqq")
+
+class TraceWriter:
+    """
+    Writes a trace to a binary trace file as it is recorded, in place of the Trace of a scheduler.
+    Like a Trace, consecutive time steps of the same state and level are merged into one segment.
+
+    Attributes:
+        file: The trace file
+        names (list): The states appearing in the trace, indexed by their state id
+        segment (list): The state id, level, start and length of the last segment, not written yet
+        count (int): The number of segments written
+        duration (int): The total time covered by the trace
+    """
+    def __init__(self, path: str, buffer_size: int = 1 << 20) -> None:
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, 0, 0, 0))
+        self.names = []
+        self.name_ids = {}
+        self.segment = None
+        self.count = 0
+        self.duration = 0
+
+    def __getstate__(self) -> dict:
+        # A scheduler snapshot saves how far the file was written, and
+        # resuming it goes back to that point of the file
+        self.file.flush()
+        return dict(self.__dict__, file=None, path=os.path.abspath(self.file.name), offset=self.file.tell())
+
+    def __setstate__(self, state: dict) -> None:
+        path, offset = state.pop("path"), state.pop("offset")
+        self.__dict__.update(state)
+        self.file = open(path, "r+b")
+        self.file.truncate(offset)
+        self.file.seek(offset)
+
+    def append(self, state: str, level: int, length: int = 1) -> None:
+        """
+        Appends length time steps of the given state and level to the end of the trace,
+        writing the last segment once a different one starts
+
+        Returns:
+            None
+        """
+        state_id = self.name_ids.get(state)
+        if state_id is None:
+            state_id = self.name_ids[state] = len(self.names)
+            self.names.append(state)
+        if self.segment and self.segment[0] == state_id and self.segment[1] == level:
+            self.segment[3] += length
+        else:
+            if self.segment:
+                self.file.write(RECORD.pack(*self.segment))
+                self.count += 1
+            self.segment = [state_id, level, self.duration, length]
+        self.duration += length
+
+    def close(self, processes_details: dict = None) -> None:
+        """
+        Writes the last segment and the process table, and closes the file
+
+        Arguments:
+        processes_details (dict): The arrival time and duration of each process, as made by getProcessData
+
+        Returns:
+            None
+        """
+        if self.segment:
+            self.file.write(RECORD.pack(*self.segment))
+            self.count += 1
+            self.segment = None
+        processes_details = processes_details or {}
+        table = json.dumps([[name, *processes_details.get(name, (None, None))] for name in self.names]).encode()
+        table_offset = HEADER.size + self.count * RECORD.size
+        self.file.write(table)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.count, self.duration, table_offset, len(table)))
+        self.file.close()
+
+    def __len__(self) -> int:
+        return self.duration
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if not self.file.closed:
+            self.close()
+
+def writeTraceFile(path: str, trace: Trace, processes_details: dict = None) -> None:
+    """
+    Writes a trace held in memory to a binary trace file
+
+    Returns:
+        None
+    """
+    writer = TraceWriter(path)
+    for state, level, start, length in trace.segments():
+        writer.append(state, level, length)
+    writer.close(processes_details)
+
+class MappedTrace(Trace):
+    """
+    Read-only trace backed by a memory-mapped binary trace file
+
+    The columns are NumPy views of the records in the file, so opening a trace does not read its
+    segments, and the operating system only loads the pages of the file that are used.
+
+    Attributes:
+        path (str): The trace file
+        process_data (dict): The arrival time and duration of each process of the process table
+    """
+    def __init__(self, path: str) -> None:
+        import numpy as np
+
+        super().__init__()
+        self.path = path
+        with open(path, "rb") as file:
+            magic, version, record_size, count, duration, table_offset, table_length = HEADER.unpack(
+                file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError(f"{path} is not a trace file of version {VERSION}")
+            if not table_offset:
+                raise ValueError(f"{path} was not closed, its process table is missing")
+            file.seek(table_offset)
+            table = json.loads(file.read(table_length))
+
+        self.names = [name for name, arrival_time, duration in table]
+        self.name_ids = {name: state_id for state_id, name in enumerate(self.names)}
+        self.process_data = {name: [arrival_time, burst_time] for name, arrival_time, burst_time in table
+                             if arrival_time is not None}
+        self.duration = duration
+        dtype = np.dtype([("id", "<i4"), ("level", "<i4"), ("start", "<i8"), ("length", "<i8")])
+        if count:
+            records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,))
+        else:
+            records = np.zeros(0, dtype=dtype)
+        self.ids = records["id"]
+        self.levels = records["level"]
+        self.starts = records["start"]
+        self.lengths = records["length"]
+
+    def append(self, state: str, level: int, length: int = 1) -> None:
+        raise TypeError("a trace file is read-only, record new traces with a TraceWriter")
+
+    def segments(self, end: int = None, start: int = 0, chunk_size: int = 65536):
+        """
+        Iterates over the segments of the trace, or over its time steps from start to end,
+        reading the file one chunk of records at a time
+
+        Returns:
+            Iterator(tuple): (state, level, start, length) of each segment
+        """
+        start = max(start, 0)
+        end = self.duration if end is None else min(end, self.duration)
+        if start >= end:
+            return
+        names = self.names
+        first = max(int(self.starts.searchsorted(start, side="right")) - 1, 0)
+        last = int(self.starts.searchsorted(end, side="left"))
+        for chunk in range(first, last, chunk_size):
+            chunk_end = min(chunk + chunk_size, last)
+            for state_id, level, segment_start, length in zip(self.ids[chunk:chunk_end].tolist(),
+                                                              self.levels[chunk:chunk_end].tolist(),
+                                                              self.starts[chunk:chunk_end].tolist(),
+                                                              self.lengths[chunk:chunk_end].tolist()):
+                segment_end = min(segment_start + length, end)
+                segment_start = max(segment_start, start)
+                yield names[state_id], level, segment_start, segment_end - segment_start
+
+    def segmentAt(self, time_step: int) -> int:
+        """
+        Finds the segment covering a time step
+
+        Returns:
+            int: Index of the segment
+        """
+        if not 0 <= time_step < self.duration:
+            raise IndexError("time step out of the trace")
+        return int(self.starts.searchsorted(time_step, side="right")) - 1
+
+    def levelAt(self, time_step: int) -> int:
+        """
+        Checks the level of the CPU at a time step
+
+        Returns:
+            int: The level
+        """
+        return int(self.levels[self.segmentAt(time_step)])
+
+    def maxLevel(self) -> int:
+        """
+        Checks the lowest level the CPU ran at
+
+        Returns:
+            int: The largest level of the trace, 0 if it is empty
+        """
+        return int(self.levels.max()) if len(self.levels) else 0
+
+class TraceReplay:
+    """
+    Finished scheduler replaying a trace file, for navigating it like a simulation in the interface
+
+    Attributes:
+        trace (MappedTrace): The replayed trace
+        time_step (int): The end of the trace
+        arrivals (ArrivalQueue): No process is left to arrive
+    """
+    def __init__(self, trace: MappedTrace) -> None:
+        self.trace = trace
+        self.time_step = len(trace)
+        self.arrivals = ArrivalQueue()
+        self.accumulators = {}
+
+    def step(self) -> bool:
+        return False
+
+    def jump(self) -> bool:
+        return False
+
+    def run(self) -> Trace:
+        return self.trace
+
+    def metrics(self) -> dict:
+        """
+        Calculates the metrics of every process of the trace, as Scheduler.metrics does
+
+        Returns:
+            dict(str, dict): The metrics of each process, by name.
+        """
+        import numpy as np
+        from metrics import computeMetrics
+
+        results = computeMetrics(self.trace, self.trace.process_data)
+        # A process is dispatched every time the CPU switches to it from another state
+        ids = np.asarray(self.trace.ids)
+        switches = np.ones(len(ids), dtype=bool)
+        switches[1:] = ids[1:] != ids[:-1]
+        dispatches = np.bincount(ids[switches], minlength=len(self.trace.names)).tolist()
+        return {name: {"arrival_time": arrival_time, "first_run": first_run, "completion_time": completion_time,
+                       "burst_time": burst_time, "waiting_time": waiting_time, "response_time": response_time,
+                       "turnaround_time": turnaround_time, "run_time": burst_time,
+                       "dispatches": dispatches[self.trace.name_ids[name]]}
+                for name, arrival_time, first_run, completion_time, burst_time, waiting_time, response_time,
+                turnaround_time in zip(results["names"], *(results[column].tolist() for column in
+                                       ("arrival", "first_run", "completion", "burst", "waiting", "response",
+                                        "turnaround")))}
+
+# Benchmark
+if __name__ == "__main__":
+    import tempfile
+    import time
+    import tracemalloc
+    from rr import RoundRobin
+    from utils import calculateMetrics, getProcessData, initializeProcessStack
+
+    path = os.path.join(tempfile.mkdtemp(), "run.trace")
+    processes = initializeProcessStack(num_processes=50000, max_arrival_time=400000)
+    process_data = getProcessData(processes)
+    scheduler = RoundRobin(processes, 1)
+    scheduler.trace = TraceWriter(path)
+    start = time.perf_counter()
+    scheduler.run().close(process_data)
+    print(f"Recorded {scheduler.trace.count} segments in {time.perf_counter() - start:.2f} s, "
+          f"{os.path.getsize(path) / 1e6:.1f} MB")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    trace = MappedTrace(path)
+    results = calculateMetrics(trace, trace.process_data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"Metrics of the mapped trace: {time.perf_counter() - start:.2f} s, peak memory {peak / 1e6:.1f} MB")
+    middle = len(trace) // 2
+    start = time.perf_counter()
+    window = list(trace.segments(middle + 100, middle))
+    print(f"Segments of a window: {(time.perf_counter() - start) * 1000:.2f} ms")
+    os.remove(path)
@@ -1,15 +1,12 @@
 from process import Process
 from stack import Stack
-import matplotlib.colors as mcolors
 import random
-import matplotlib.pyplot as plt
-import numpy as np
-from PIL import Image
-import pandas as pd
-from io import BytesIO
 random.seed(10)
 
-def initializeProcessStack(num_processes: int = 8, min_arrival_time: int = 0, max_arrival_time: int = 30, min_duration:int = 3, max_duration: int = 15, max_tickets: int = None, depends_on_probability: float = None) -> Stack:
+# The simulation only needs the standard library: NumPy and matplotlib are imported by the
+# functions using them, the first time they are called, so headless workers start fast
+
+def initializeProcessStack(num_processes: int = 8, min_arrival_time: int = 0, max_arrival_time: int = 30, min_duration:int = 3, max_duration: int = 15, max_tickets: int = None, depends_on_probability: float = None, generator: random.Random = None) -> Stack:
     """
     Initializes a stack of processes with random attributes.
 
@@ -23,6 +20,7 @@ def initializeProcessStack(num_processes: int = 8, min_arrival_time: int = 0, ma
         max_duration (int): The maximum duration for generated processes (default is 50).
         max_tickets (int): The maximum number of tickets a process can request.
         depends_on_probability (float): The probability of a process depending on another process.
+        generator (random.Random): The source of the random attributes (default is the global random state).
 
     Example usage:
     >>> initializeProcessStack()
@@ -31,14 +29,15 @@ def initializeProcessStack(num_processes: int = 8, min_arrival_time: int = 0, ma
     Returns:
         Stack: A stack of Process objects representing the generated processes, sorted by arrival time.
     """
+    generator = generator or random
     stack = Stack()
     for _ in range(num_processes):
-        rand_arrival_time = random.randint(min_arrival_time, max_arrival_time + 1)
-        rand_duration = random.randint(min_duration, max_duration + 1)
+        rand_arrival_time = generator.randint(min_arrival_time, max_arrival_time + 1)
+        rand_duration = generator.randint(min_duration, max_duration + 1)
         if max_tickets:
-            rand_ticket = random.randint(1, max_tickets + 1)
+            rand_ticket = generator.randint(1, max_tickets + 1)
             if depends_on_probability:
-                rand_depends_on = random.uniform(0, 1)
+                rand_depends_on = generator.uniform(0, 1)
                 depends_on = stack.getRandom(rand_depends_on, depends_on_probability)
                 stack.push(Process(rand_arrival_time, rand_duration, rand_ticket, depends_on))
             else:
@@ -69,31 +68,12 @@ def getArrivedProcesses(stack: Stack, time_step:int) -> list:
 
     return processes
 
-def generate_color(process_name: str) -> tuple:
-    """
-    Generates a dim and relaxing RGBA color code based on the number in the process name.
-
-    Arguments:
-    process_name (str): Name of the process (e.g., 'P1', 'P2').
-
-    Returns:
-    tuple: RGBA color.
-    """
-    if process_name.startswith('P'):
-        number = int(process_name[1:])  # Extract number from process name
-        hue = number / 10.0 % 1  # Ensure hue is between 0 and 1
-        saturation = 0.5  # Reduced saturation for a more muted color
-        value = 0.7  # Reduced brightness for a dimmer color
-        rgb_color = mcolors.hsv_to_rgb([hue, saturation, value])
-        return rgb_color  # Returns a RGB color, Matplotlib automatically considers alpha as 1
-    return '#808080'  # Default color for non-process states
-
 def plotGanttChart(data: dict) -> None:
     """
     Plots a gantt chart for the CPU process using data coming from a scheduler output
 
     Arguments:
-    data (dict[str, list]): Dictionary holding the data for plotting the gantt chart.
+    data (Trace/dict[str, list]): Trace or dictionary holding the data for plotting the gantt chart.
 
     Example usage:
     >>> plotGanttChart({
@@ -105,55 +85,23 @@ def plotGanttChart(data: dict) -> None:
     Returns:
         None
     """
-    df = pd.DataFrame(data)
-    df['start_time'] = df.index
-
-    unique_states = df['state'].unique()
-    unique_states = unique_states.tolist()
-    try:
-        unique_states.remove('idle')
-    except ValueError:
-        pass
-
-    # Use the generate_color function to create color mapping
-    state_colors = {state: generate_color(state) for state in unique_states}
-
-    max_level = df['level'].max()
-    y_ticks_labels = {level: str(max_level - level) for level in range(max_level + 1)}
+    import matplotlib.pyplot as plt
+    from gantt import ZoomableGanttChart
 
     fig, ax = plt.subplots(figsize=(15, 8))
-
-    for index, row in df.iterrows():
-        start = row['start_time']
-        end = start + 1
-        level = max_level - row['level']
-        state = row['state']
-
-        if state == 'idle':
-            continue
-
-        ax.broken_barh([(start, end - start)], (level - 0.4, 0.8), facecolors=state_colors[state])
-
-    ax.set_xlabel('Time Steps')
-    ax.set_ylabel('Level')
-    ax.set_title('Gantt Chart of CPU Scheduler States')
-    ax.set_yticks(range(max_level + 1))
-    ax.set_yticklabels([y_ticks_labels[y] for y in range(max_level + 1)])
-    ax.set_xticks(range(len(data['state']) + 1))
-    tick_labels = [str(i) for i in range(len(data['state']) + 1)]
-    ax.set_xticklabels(tick_labels, rotation=45)
-    ax.grid(True)
-
-    legend_elements = [plt.Line2D([0], [0], color=state_colors[state], lw=4, label=state) for state in unique_states]
-    ax.legend(handles=legend_elements, loc='upper right')
+    ZoomableGanttChart(ax).draw(data)
     plt.show()
 
-def saveGanttChart(data:dict, ax, canvas):
+def saveGanttChart(data:dict, ax, canvas, until: int = None, width: int = 0):
     """
-    Saves a gantt chart for the CPU process using data coming from a scheduler output
+    Draws a gantt chart for the CPU process using data coming from a scheduler output, on the axes of a canvas
 
     Arguments:
-    data (dict[str, list]): Dictionary holding the data for plotting the gantt chart.
+    data (Trace/dict[str, list]): Trace or dictionary holding the data for plotting the gantt chart.
+    ax (matplotlib.axes.Axes): The axes to draw the chart on.
+    canvas (FigureCanvasTkAgg): The canvas of the axes, redrawn once the chart is drawn.
+    until (int): Only plot the first until time steps, the whole trace by default.
+    width (int): The least number of time steps shown on the time axis.
 
     Example usage:
     >>> saveGanttChart({
@@ -163,49 +111,12 @@ def saveGanttChart(data:dict, ax, canvas):
             'level': [0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 0, 0, 0, 0, 0, 0, 1, 1, 1]})
     
     Returns:
-        PIL.Image
+        None
     """
-    # Convert the input data into a DataFrame for easier manipulation
-    df = pd.DataFrame(data)
-    df['start_time'] = df.index
-
-    unique_states = df['state'].unique()
-    unique_states = unique_states.tolist()
-    try:
-        unique_states.remove('idle')
-    except ValueError:
-        pass
-
-    # Use the generate_color function to create color mapping
-    state_colors = {state: generate_color(state) for state in unique_states}
-
-    max_level = df['level'].max()
-    y_ticks_labels = {level: str(max_level - level) for level in range(max_level + 1)}
-
-    ax.clear()
-    for index, row in df.iterrows():
-        start = row['start_time']
-        end = start + 1
-        level = max_level - row['level']
-        state = row['state']
-
-        if state == 'idle':
-            continue
-
-        ax.broken_barh([(start, end - start)], (level - 0.4, 0.8), facecolors=state_colors[state])
-
-    ax.set_xlabel('Time Steps')
-    ax.set_ylabel('Level')
-    ax.set_title('Gantt Chart of CPU Scheduler States')
-    ax.set_yticks(range(max_level + 1))
-    ax.set_yticklabels([y_ticks_labels[y] for y in range(max_level + 1)])
-    ax.set_xticks(range(len(data['state']) + 1))
-    tick_labels = [str(i) for i in range(len(data['state']) + 1)]
-    ax.set_xticklabels(tick_labels, rotation=45)
-    ax.grid(True)
-
-    legend_elements = [plt.Line2D([0], [0], color=state_colors[state], lw=4, label=state) for state in unique_states]
-    ax.legend(handles=legend_elements, loc='upper right')
+    import matplotlib.pyplot as plt
+    from gantt import ZoomableGanttChart
+
+    ZoomableGanttChart(ax).draw(data, until, width)
     canvas.draw()
     plt.close()
     
@@ -236,7 +147,7 @@ def calculateMetrics(data: list, processes_details:dict) -> dict:
     and calculates: response time, waiting time and turnaround time
 
     Arguments:
-    data (dict): Dictionary containing all the run-time data of a scheduler
+    data (Trace/list): Trace or list of the states at every time step of a scheduler
     process_details (dict): Dictionary containing details about the processes themselves before running
 
     Example usage:
@@ -249,22 +160,9 @@ def calculateMetrics(data: list, processes_details:dict) -> dict:
     dict(str, list): A dictionary with processes as keys, and list of all calculated time scheduling metrics
     for the process in a list as values
     """
-    occurrences = {}
-    details = {}
+    from metrics import computeMetrics, metricsToDetails
 
-    for i, process in enumerate(data):
-        if process != 'idle':
-            if process not in occurrences:
-                occurrences[process] = [i, None]
-            occurrences[process][1] = i
-
-    for process, (first_idx, last_idx) in occurrences.items():
-        turnaround_time = last_idx - processes_details[process][0] + 1
-        response_time = first_idx - processes_details[process][0]
-        waiting_time = turnaround_time - processes_details[process][1]
-        details[process] = [processes_details[process][0], first_idx, last_idx + 1, processes_details[process][1], waiting_time, response_time, turnaround_time]
-
-    return details
+    return metricsToDetails(computeMetrics(data, processes_details))
 
 def calculatePerformance(data: dict):
     waiting_time = 0
@@ -274,9 +172,15 @@ def calculatePerformance(data: dict):
         count += 1
         waiting_time += data[key][-3]
         response_time += data[key][-2]
+    if not count:
+        # No process ran, as with an empty workload
+        return 0.0, 0.0
     return waiting_time/count, response_time/count
 
 def savePerformancePlot(names, average_waiting_times, average_response_times, ax, canvas):
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     X_axis = np.arange(len(names)) 
     
     bars1 = ax.bar(X_axis - 0.2, average_waiting_times, 0.4, label='Average Waiting Time')
@@ -0,0 +1,576 @@
+"""
+Workloads: the immutable workload shared by runs, and streaming workload files
+
+A Workload holds the processes as read-only columns and is never modified by a scheduler: every run
+gets its own remaining time column and creates light views of the processes as they arrive, so any
+number of schedulers can run on the same workload without copying or resetting it.
+
+Example usage:
+>>> workload = Workload.fromProcesses(stack.items)
+>>> fcfs, rr = FCFS(workload.arrivals()).run(), RoundRobin(workload.arrivals(), 2).run()
+
+A workload file has one process per row, sorted by arrival time, with the whole-number columns arrival_time and
+duration (burst and burst_time are accepted too), and optionally name, tickets (1 when missing), priority
+and depends_on, the name of a process appearing earlier in the file. CSV, JSON Lines and Parquet files are read row by row,
+or batch by batch for Parquet, so a workload of any size is never held in memory at once.
+
+Example usage:
+>>> arrivals = ArrivalStream(streamProcesses("trace.csv"))
+>>> FCFS(arrivals).run()
+"""
+import csv
+import itertools
+import json
+import os
+import weakref
+from array import array
+from multiprocessing import shared_memory
+from arrivals import ArrivalStream
+from process import Process, ProcessState
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+# Other names of the columns, as found in production traces
+ALIASES = {"arrival": "arrival_time", "burst": "duration", "burst_time": "duration"}
+
+def readCSV(path: str):
+    """
+    Reads the rows of a CSV file with a header
+
+    Returns:
+        Iterator(dict): The values of each row by column, None for empty ones
+    """
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file):
+            yield {column: value if value != "" else None for column, value in row.items()}
+
+def readJSONLines(path: str):
+    """
+    Reads the rows of a JSON Lines file, one JSON object per line
+
+    Returns:
+        Iterator(dict): The values of each row by column
+    """
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+def readParquet(path: str, batch_size: int = 65536):
+    """
+    Reads the rows of a Parquet file, one batch of rows at a time. Needs pyarrow.
+
+    Returns:
+        Iterator(dict): The values of each row by column
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Reading Parquet workloads needs pyarrow, install it with `pip install pyarrow`") from error
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+def readRows(path: str, format: str = None):
+    """
+    Reads the rows of a workload file, in the format given by its extension unless format is given
+
+    Returns:
+        Iterator(dict): The values of each row by column
+    """
+    format = format or FORMATS.get(os.path.splitext(path)[1].lower())
+    if format == "csv":
+        return readCSV(path)
+    if format == "jsonl":
+        return readJSONLines(path)
+    if format == "parquet":
+        return readParquet(path)
+    raise ValueError(f"Unknown workload format of {path}, expected one of: {', '.join(FORMATS)}")
+
+def wholeNumber(value, column: str) -> int:
+    """
+    Reads a time of a process, which the schedulers only support as a whole number
+
+    Returns:
+        int: The value
+    """
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            value = float(value)
+    if value != int(value):
+        raise ValueError(f"The {column} of every process must be a whole number, got {value}")
+    return int(value)
+
+def wholeNumbers(values, column: str) -> array:
+    """
+    Packs a column of a workload into 64-bit integers, rejecting fractional values instead of truncating them
+
+    Returns:
+        array: The column
+    """
+    try:
+        return array("q", values)
+    except TypeError:
+        return array("q", (wholeNumber(value, column) for value in values))
+
+def streamProcesses(path: str, format: str = None):
+    """
+    Creates the processes of a workload file one at a time, in the order of the file
+
+    Returns:
+        ProcessStream: The processes of the workload
+    """
+    return ProcessStream(path, format)
+
+class ProcessStream:
+    """
+    Iterator over the processes of a workload file, created one at a time in the order of the file
+
+    A process only keeps the process it depends on alive, the names of the others are forgotten once they
+    are not used anymore, so a dependency on a process that already finished and was released is dropped.
+    A stream is saved as the path of its file and the number of rows it read, and goes back to that row
+    of the file when it is loaded, so saving it never reads the rest of the file.
+
+    Attributes:
+        path (str): The absolute path of the workload file
+        format (str): The format of the file, None to get it from its extension
+        rows_read (int): The number of rows read so far
+        processes (WeakValueDictionary): The processes read that are still used, by name
+    """
+    def __init__(self, path: str, format: str = None) -> None:
+        self.path = os.path.abspath(path)
+        self.format = format
+        self.rows = readRows(self.path, format)
+        self.rows_read = 0
+        self.processes = weakref.WeakValueDictionary()
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path, "format": self.format, "rows_read": self.rows_read,
+                "processes": dict(self.processes)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"], state["format"])
+        self.processes.update(state["processes"])
+        for _ in itertools.islice(self.rows, state["rows_read"]):
+            pass
+        self.rows_read = state["rows_read"]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Process:
+        row = next(self.rows)
+        self.rows_read += 1
+        row = {ALIASES.get(column, column): value for column, value in row.items()}
+        tickets, priority, depends_on = row.get("tickets"), row.get("priority"), row.get("depends_on")
+        process = Process(wholeNumber(row["arrival_time"], "arrival_time"), wholeNumber(row["duration"], "duration"),
+                          int(tickets) if tickets is not None else 1,
+                          self.processes.get(str(depends_on)) if depends_on is not None else None,
+                          row.get("name"), int(priority) if priority is not None else None)
+        self.processes[process.name] = process
+        return process
+
+class Workload:
+    """
+    Immutable workload, shared by any number of runs
+
+    The processes are sorted by arrival time (keeping the order of processes arriving together) and
+    stored as read-only columns of 64-bit integers, so a process costs about 48 bytes however many
+    runs use it, and the whole workload is sent to a worker process as a few byte strings. The times
+    must be whole numbers, as for the schedulers: fractional ones are rejected instead of truncated.
+
+    Attributes:
+        pid (memoryview): The PID of each process
+        arrival (memoryview): The arrival time of each process
+        burst (memoryview): The duration of each process
+        tickets (memoryview): The tickets of each process, 0 if it has none
+        priority (memoryview): The priority of each process
+        depends_on (memoryview): The index of the process each process depends on, -1 if none
+        names (list): The name of each process, None when they are all named after their PID
+    """
+    COLUMNS = ("pid", "arrival", "burst", "tickets", "priority", "depends_on")
+
+    def __init__(self, arrival, burst, tickets=None, priority=None, depends_on=None, pid=None, names=None) -> None:
+        size = len(arrival)
+        if pid is None:
+            # New processes, their PIDs are reserved from the same counter as Process
+            pid = range(Process.pid_counter + 1, Process.pid_counter + size + 1)
+            Process.pid_counter += size
+        columns = {"pid": pid, "arrival": arrival, "burst": burst,
+                   "tickets": [0] * size if tickets is None else tickets,
+                   "priority": [0] * size if priority is None else priority,
+                   "depends_on": [-1] * size if depends_on is None else depends_on}
+        for column in self.COLUMNS:
+            values = columns[column]
+            if not isinstance(values, memoryview):
+                values = memoryview(wholeNumbers(values, column))
+            setattr(self, column, values.toreadonly())
+        self.names = names
+
+    @classmethod
+    def fromProcesses(cls, processes: list):
+        """
+        Makes a workload out of processes in the order they are released, keeping their PIDs and names.
+        Processes arriving at the same time keep their order in the list.
+
+        Returns:
+            Workload: The workload of the processes
+        """
+        processes = sorted(processes, key=lambda process: process.arrival_time)
+        indices = {id(process): index for index, process in enumerate(processes)}
+        names = [process.name for process in processes]
+        if all(name == f"P{process.pid}" for name, process in zip(names, processes)):
+            names = None
+        return cls([process.arrival_time for process in processes],
+                   [process.duration for process in processes],
+                   [process.tickets or 0 for process in processes],
+                   [getattr(process, "priority", None) or 0 for process in processes],
+                   [indices.get(id(process.depends_on), -1) for process in processes],
+                   [process.pid for process in processes], names)
+
+    def __reduce__(self):
+        # Memory views can not be pickled, the columns are sent as bytes
+        return (self.fromBytes, (*(getattr(self, column).tobytes() for column in self.COLUMNS), self.names))
+
+    @classmethod
+    def fromBytes(cls, pid: bytes, arrival: bytes, burst: bytes, tickets: bytes, priority: bytes,
+                  depends_on: bytes, names: list = None):
+        """
+        Makes a workload out of the bytes of its columns, without copying them
+
+        Returns:
+            Workload: The workload
+        """
+        pid, arrival, burst, tickets, priority, depends_on = (memoryview(column).cast("q") for column in
+                                                              (pid, arrival, burst, tickets, priority, depends_on))
+        return cls(arrival, burst, tickets, priority, depends_on, pid, names)
+
+    def __len__(self) -> int:
+        return len(self.pid)
+
+    def name(self, index: int) -> str:
+        """
+        Gets the name of a process
+
+        Returns:
+            str: The name of the process
+        """
+        return self.names[index] if self.names is not None else f"P{self.pid[index]}"
+
+    def processData(self) -> dict:
+        """
+        Gets the arrival time and duration of every process, as getProcessData does
+
+        Returns:
+            dict(str, list)
+        """
+        return {self.name(index): [self.arrival[index], self.burst[index]] for index in range(len(self))}
+
+    def arrivals(self) -> ArrivalStream:
+        """
+        Starts a new run of the workload: the processes are created as they arrive,
+        as views of the workload with their own remaining time
+
+        Returns:
+            ArrivalStream: The processes of the run, for a scheduler
+        """
+        return ArrivalStream(WorkloadArrivals(WorkloadRun(self)))
+
+    def share(self):
+        """
+        Copies the workload into shared memory, to be read by other processes without copying it again
+
+        Returns:
+            SharedWorkload: The shared copy of the workload, to unlink once no process uses it anymore
+        """
+        return SharedWorkload.fromWorkload(self)
+
+class SharedWorkload(Workload):
+    """
+    Workload stored in one multiprocessing.shared_memory block
+
+    The columns are views of the block, and a shared workload is sent to other processes as the name
+    of its block, so every process reads the same copy of the processes in place. The names, when the
+    processes have their own, are stored in the block too, as UTF-8 bytes and the offset of each name.
+
+    Attributes:
+        memory (SharedMemory): The block of the workload
+        owner (bool): Whether this process created the block, and unlinks it
+        name_offsets (memoryview): The start of the name of each process in name_bytes, None when they are
+                                   all named after their PID
+        name_bytes (memoryview): The names of the processes, one after the other
+    """
+    def __init__(self, memory: shared_memory.SharedMemory, size: int, named: bool = False, owner: bool = False) -> None:
+        self.memory = memory
+        self.owner = owner
+        column_size = 8 * size
+        buffer = memory.buf
+        super().__init__(*(buffer[position * column_size:(position + 1) * column_size].cast("q")
+                           for position in range(1, len(self.COLUMNS))),
+                         pid=buffer[:column_size].cast("q"))
+        self.name_offsets = self.name_bytes = None
+        if named:
+            start = len(self.COLUMNS) * column_size
+            self.name_offsets = buffer[start:start + column_size + 8].cast("q").toreadonly()
+            start += column_size + 8
+            self.name_bytes = buffer[start:start + self.name_offsets[size]].toreadonly()
+
+    @classmethod
+    def fromWorkload(cls, workload: Workload):
+        """
+        Copies a workload into a new shared memory block
+
+        Returns:
+            SharedWorkload: The shared workload, owning its block
+        """
+        size = len(workload)
+        names = [name.encode() for name in workload.names] if workload.names is not None else None
+        column_size = 8 * size
+        memory_size = len(cls.COLUMNS) * column_size
+        if names is not None:
+            offsets = array("q", itertools.accumulate(map(len, names), initial=0))
+            memory_size += column_size + 8 + offsets[-1]
+        memory = shared_memory.SharedMemory(create=True, size=max(memory_size, 1))
+        buffer = memory.buf
+        for position, column in enumerate(cls.COLUMNS):
+            buffer[position * column_size:(position + 1) * column_size] = getattr(workload, column).cast("B")
+        if names is not None:
+            start = len(cls.COLUMNS) * column_size
+            buffer[start:start + column_size + 8] = memoryview(offsets).cast("B")
+            buffer[start + column_size + 8:memory_size] = b"".join(names)
+        return cls(memory, size, names is not None, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, size: int, named: bool):
+        """
+        Opens the shared memory block of a workload shared by another process
+
+        Returns:
+            SharedWorkload: The shared workload
+        """
+        try:
+            # The process that shared the workload is the only one unlinking it
+            memory = shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            memory = shared_memory.SharedMemory(name)
+        return cls(memory, size, named)
+
+    def __reduce__(self):
+        # Only the name of the block is sent, the other process reads the same memory
+        return (self.attach, (self.memory.name, len(self), self.name_offsets is not None))
+
+    def name(self, index: int) -> str:
+        if self.name_offsets is None:
+            return f"P{self.pid[index]}"
+        return bytes(self.name_bytes[self.name_offsets[index]:self.name_offsets[index + 1]]).decode()
+
+    def share(self):
+        return self
+
+    def close(self) -> None:
+        """
+        Releases the views of the block and closes it in this process, the workload can not be used anymore
+
+        Returns:
+            None
+        """
+        if self.memory is None:
+            return
+        for column in self.COLUMNS:
+            getattr(self, column).release()
+        if self.name_offsets is not None:
+            self.name_offsets.release()
+            self.name_bytes.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+        self.memory = None
+
+    def __del__(self) -> None:
+        # The views must be released before the block is closed
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class WorkloadRun:
+    """
+    The mutable state of one run of a workload
+
+    Attributes:
+        workload (Workload): The workload of the run
+        remaining (array): The duration left of each process, by index in the workload
+    """
+    __slots__ = ("workload", "remaining")
+
+    def __init__(self, workload: Workload) -> None:
+        self.workload = workload
+        self.remaining = array("q")
+        self.remaining.frombytes(workload.burst.cast("B"))
+
+class WorkloadArrivals:
+    """
+    Iterator creating the processes of a run of a workload in arrival order, saved as its run and position
+
+    Attributes:
+        run (WorkloadRun): The run of the processes
+        index (int): The index in the workload of the next process
+    """
+    __slots__ = ("run", "index")
+
+    def __init__(self, run: WorkloadRun) -> None:
+        self.run = run
+        self.index = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.index >= len(self.run.workload):
+            raise StopIteration
+        process = WorkloadProcess(self.run, self.index)
+        self.index += 1
+        return process
+
+class WorkloadProcess:
+    """
+    A process of a run of a workload, with the attributes of a Process. Its duration is the
+    duration left in the run, everything else is read from the workload.
+
+    Attributes:
+        run (WorkloadRun): The run of the process
+        index (int): The index of the process in the workload
+        arrival_time (int): When the process arrives
+        state (ProcessState): The state of the process
+        quantum (int): The time left of the quantum of the process
+    """
+    __slots__ = ("run", "index", "arrival_time", "state", "quantum", "__weakref__")
+
+    def __init__(self, run: WorkloadRun, index: int) -> None:
+        self.run = run
+        self.index = index
+        self.arrival_time = run.workload.arrival[index]
+        self.state = ProcessState.EMBRYO
+        self.quantum = 0
+
+    @property
+    def pid(self) -> int:
+        return self.run.workload.pid[self.index]
+
+    @property
+    def name(self) -> str:
+        return self.run.workload.name(self.index)
+
+    @property
+    def duration(self) -> int:
+        return self.run.remaining[self.index]
+
+    @duration.setter
+    def duration(self, duration: int) -> None:
+        self.run.remaining[self.index] = duration
+
+    @property
+    def tickets(self) -> int:
+        return self.run.workload.tickets[self.index] or None
+
+    @property
+    def priority(self) -> int:
+        return self.run.workload.priority[self.index]
+
+    @property
+    def depends_on(self) -> int:
+        """
+        The index in the workload of the process this one depends on, None if it does not depend on any
+        """
+        index = self.run.workload.depends_on[self.index]
+        return index if index >= 0 else None
+
+    def decrementDuration(self, time: int = 1):
+        self.run.remaining[self.index] -= time
+        if self.quantum:
+            self.quantum = max(self.quantum - time, 0)
+
+    def __gt__(self, other):
+        return self.name > other.name
+
+    def __lt__(self, other):
+        return self.name < other.name
+
+# Benchmark
+if __name__ == "__main__":
+    import random
+    import tempfile
+    import time
+    import tracemalloc
+    from arrivals import ArrivalQueue, ArrivalStream
+
+    num_processes = 200000
+    path = os.path.join(tempfile.mkdtemp(), "workload.csv")
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["name", "arrival_time", "duration", "tickets", "priority", "depends_on"])
+        arrival_time = 0
+        for i in range(num_processes):
+            arrival_time += random.randint(0, 20)
+            writer.writerow([f"J{i}", arrival_time, random.randint(3, 15), random.randint(1, 100),
+                             random.randint(0, 7), f"J{i - 1}" if i and random.random() < 0.01 else ""])
+
+    def releaseAll(arrivals) -> int:
+        # Releases the processes at their arrival times, as a scheduler does
+        count = 0
+        while not arrivals.isEmpty():
+            count += len(arrivals.popUntil(arrivals.nextArrivalTime()))
+        return count
+
+    print("Arrivals\tTime (s)\tPeak memory (MB)")
+    for name, arrivals in (("Loaded", lambda: ArrivalQueue(list(streamProcesses(path)))),
+                           ("Streamed", lambda: ArrivalStream(streamProcesses(path)))):
+        start = time.perf_counter()
+        releaseAll(arrivals())
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        releaseAll(arrivals())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name}\t\t{elapsed:.2f}\t\t{peak / 1e6:.1f}")
+
+    # Workload of several runs: new processes for every run, or runs of one shared workload
+    processes = list(streamProcesses(path))
+    runs = 8
+    print("Runs\t\tSetup (s)\tMemory (MB)")
+    for name, newRun in (("Copies", lambda: ArrivalQueue([Process(process.arrival_time, process.duration,
+                                                                  process.tickets, name=process.name)
+                                                          for process in processes])),
+                         ("Shared", lambda workload=Workload.fromProcesses(processes): workload.arrivals())):
+        tracemalloc.start()
+        start = time.perf_counter()
+        arrivals = [newRun() for _ in range(runs)]
+        elapsed = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name}\t\t{elapsed:.2f}\t\t{memory / 1e6:.1f}")
+        del arrivals
+    os.remove(path)
+
+    # Workers opening a workload of 10M processes: sent as its columns, or as the name of its shared memory
+    import multiprocessing
+    import pickle
+
+    num_processes, workers = 10_000_000, 16
+    workload = Workload(range(num_processes), [5] * num_processes, [1] * num_processes)
+    start = time.perf_counter()
+    shared = workload.share()
+    print(f"Shared {shared.memory.size / 1e6:.0f} MB in {time.perf_counter() - start:.2f} s")
+    print(f"Sent to every worker: {len(pickle.dumps(workload)) / 1e6:.0f} MB as columns, "
+          f"{len(pickle.dumps(shared))} bytes shared")
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        pool.map(len, [b""] * workers)
+        start = time.perf_counter()
+        pool.map(len, [shared] * workers)
+        print(f"{workers} workers opened the shared workload in {time.perf_counter() - start:.3f} s")
+    shared.close()